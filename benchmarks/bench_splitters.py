@@ -0,0 +1,254 @@
+"""
+Benchmark of every tsxv splitter over a grid of sequence lengths and window configurations
+
+Records, for each (splitter, len(sequence), numInputs, numOutputs, numJumps), the best wall time over a few runs,
+the peak memory allocated during one run (tracemalloc) and the number of splits and windows produced.
+Each case runs in its own process, stopped after --timeout seconds, so a splitter that never returns
+(e.g. the loop-based K-Fold of older revisions when numJumps is much larger than numInputs) is reported
+as timed out instead of hanging the whole run, and a case whose process dies (e.g. out of memory) is
+reported with its exit code. The --output file is rewritten after every case.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_splitters.py --output new.json
+    PYTHONPATH=. python benchmarks/bench_splitters.py --sizes 1000 100000 --numJumps 1 10 --output new.json
+    PYTHONPATH=. python benchmarks/bench_splitters.py --compare old.json new.json
+
+To compare two revisions, run the benchmark on each checkout (e.g. with PYTHONPATH pointing at it)
+and pass both result files to --compare.
+"""
+
+import argparse
+import contextlib
+import inspect
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from tsxv import splitTrain, splitTrainVal, splitTrainValTest
+
+SPLITTERS = [
+    ("split_train", splitTrain.split_train, {}),
+    ("split_train_variableInput", splitTrain.split_train_variableInput, {}),
+    ("split_train_val_forwardChaining", splitTrainVal.split_train_val_forwardChaining, {}),
+    ("split_train_val_forwardChaining[asViews]", splitTrainVal.split_train_val_forwardChaining, {"asViews": True}),
+    ("split_train_val_kFold", splitTrainVal.split_train_val_kFold, {}),
+    ("split_train_val_groupKFold", splitTrainVal.split_train_val_groupKFold, {}),
+    ("split_train_val_test_forwardChaining", splitTrainValTest.split_train_val_test_forwardChaining, {}),
+    ("split_train_val_test_forwardChaining[asViews]", splitTrainValTest.split_train_val_test_forwardChaining, {"asViews": True}),
+    ("split_train_val_test_kFold", splitTrainValTest.split_train_val_test_kFold, {}),
+    ("split_train_val_test_groupKFold", splitTrainValTest.split_train_val_test_groupKFold, {}),
+]
+
+
+def projected_bytes(name, lenSequence, numInputs, numOutputs, numJumps, itemsize=8):
+    """ Returns a rough upper bound of the bytes a splitter allocates, used to skip runs that would not fit """
+
+    windows = max(0, (lenSequence-numInputs-numOutputs)//numJumps + 1)
+    if "variableInput" in name:
+        return windows*(numOutputs*itemsize + 128)
+    if "asViews" in name or name == "split_train":
+        return windows*64
+    if "forwardChaining" in name:
+        return windows*windows//2*(numInputs+numOutputs)*itemsize
+    if "groupKFold" in name:
+        return 5*windows*(numInputs+numOutputs)*itemsize
+    return windows*windows*(numInputs+numOutputs)*itemsize
+
+
+def count_outputs(result):
+    """ Returns the number of splits and of (X,y) windows in a splitter output """
+
+    if isinstance(result[0], dict):
+        numSplits = len(result[0])
+        numWindows = sum(len(windows) for output in result[::2] for windows in output.values())
+        return numSplits, numWindows
+
+    return 1, len(result[0])
+
+
+def run_case(function, kwargs, sequence, numInputs, numOutputs, numJumps, repeat):
+    """ Returns the best time, peak memory, number of splits and number of windows of one configuration """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = list()
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            result = function(sequence, numInputs, numOutputs, numJumps, **kwargs)
+            times.append(time.perf_counter()-begin)
+            del result
+
+        tracemalloc.start()
+        result = function(sequence, numInputs, numOutputs, numJumps, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    numSplits, numWindows = count_outputs(result)
+    return min(times), peak, numSplits, numWindows
+
+
+def make_sequence(lenSequence):
+    return np.random.default_rng(0).standard_normal(lenSequence)
+
+
+def missing_options(function, kwargs):
+    """ Returns the options of kwargs that the splitter does not take, e.g. asViews on older revisions """
+
+    parameters = inspect.signature(function).parameters
+    return [option for option in kwargs if option not in parameters]
+
+
+def _run_child(connection, index, lenSequence, numInputs, numOutputs, numJumps, repeat):
+    _, function, kwargs = SPLITTERS[index]
+    try:
+        connection.send(run_case(function, kwargs, make_sequence(lenSequence), numInputs, numOutputs, numJumps, repeat))
+    except Exception as error:
+        connection.send(error)
+    finally:
+        connection.close()
+
+
+def run_case_isolated(index, lenSequence, numInputs, numOutputs, numJumps, repeat, timeout):
+    """ Runs run_case in a separate process
+
+    Returns:
+        outcome (tuple) : Result of run_case, None if the case did not finish
+        skipped (str)   : Why the case did not finish (timeout, or the process died, e.g. killed when out of memory)
+
+    """
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_child,
+                                      args=(sender, index, lenSequence, numInputs, numOutputs, numJumps, repeat))
+    process.start()
+    sender.close()
+
+    outcome, skipped = None, None
+    if receiver.poll(timeout):
+        try:
+            outcome = receiver.recv()
+        except EOFError:
+            # The process exited without sending anything
+            process.join()
+            skipped = "process exited with code %s" % process.exitcode
+    else:
+        process.terminate()
+        skipped = "timed out after %gs" % timeout
+    process.join()
+
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome, skipped
+
+
+def revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(report, output):
+    """ Writes the report to output through a temporary file, so an interrupted run leaves a valid file """
+
+    with open(output + ".tmp", "w") as f:
+        json.dump(report, f, indent=1)
+    os.replace(output + ".tmp", output)
+
+
+def benchmark(args):
+    results = list()
+    report = {"revision": revision(), "python": sys.version.split()[0], "numpy": np.__version__, "results": results}
+    for lenSequence in args.sizes:
+        grid = itertools.product(args.numInputs, args.numOutputs, args.numJumps)
+        for (numInputs, numOutputs, numJumps), (index, (name, function, kwargs)) in itertools.product(grid, enumerate(SPLITTERS)):
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+
+            case = {"splitter": name, "lenSequence": lenSequence, "numInputs": numInputs,
+                    "numOutputs": numOutputs, "numJumps": numJumps}
+            if missing_options(function, kwargs):
+                # Older revisions do not have every option, e.g. asViews
+                case["skipped"] = "option not available"
+            elif projected_bytes(name, lenSequence, numInputs, numOutputs, numJumps) > args.maxBytes:
+                case["skipped"] = "projected memory above --maxBytes"
+            else:
+                outcome, skipped = run_case_isolated(index, lenSequence, numInputs, numOutputs, numJumps, args.repeat,
+                                                     args.timeout)
+                if outcome is None:
+                    case["skipped"] = skipped
+                else:
+                    bestTime, peak, numSplits, numWindows = outcome
+                    case.update(time=bestTime, peakBytes=peak, numSplits=numSplits, numWindows=numWindows)
+
+            results.append(case)
+            print(format_case(case), flush=True)
+
+            # Results are written as they come, so a crash or an interrupt keeps the cases already run
+            if args.output:
+                write_report(report, args.output)
+
+    return report
+
+
+def case_key(case):
+    return (case["splitter"], case["lenSequence"], case["numInputs"], case["numOutputs"], case["numJumps"])
+
+
+def format_case(case):
+    label = "%-46s n=%-9d in=%-4d out=%-3d jump=%-4d" % case_key(case)
+    if case.get("skipped"):
+        return label + "  skipped (%s)" % case["skipped"]
+    return label + "  %10.4fs  %10.1fMiB  splits=%-7d windows=%d" % (
+        case["time"], case["peakBytes"]/2**20, case["numSplits"], case["numWindows"])
+
+
+def compare(oldFile, newFile):
+    with open(oldFile) as f:
+        old = {case_key(case): case for case in json.load(f)["results"]}
+    with open(newFile) as f:
+        new = json.load(f)["results"]
+
+    print("%-90s %10s %10s" % ("case", "time", "memory"))
+    for case in new:
+        before = old.get(case_key(case))
+        if before is None or case.get("skipped") or before.get("skipped"):
+            continue
+        timeRatio = case["time"]/before["time"] if before["time"] else float("nan")
+        memoryRatio = case["peakBytes"]/before["peakBytes"] if before["peakBytes"] else float("nan")
+        label = "%-46s n=%-9d in=%-4d out=%-3d jump=%-4d" % case_key(case)
+        print("%-90s %9.2fx %9.2fx" % (label, timeRatio, memoryRatio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6, 10**7])
+    parser.add_argument("--numInputs", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--numOutputs", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--numJumps", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--only", nargs="+", help="Only run splitters whose name contains one of these strings")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs, the best one is kept")
+    parser.add_argument("--maxBytes", type=float, default=2*2**30, help="Skip runs projected to allocate more than this")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds after which a case is stopped and skipped")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = benchmark(args)
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
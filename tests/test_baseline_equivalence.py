@@ -0,0 +1,242 @@
+"""
+Regression test pinning every splitter to the loop implementations they replaced
+
+The reference functions below are the original loops of tsxv 0.1.5, with two changes: group K-Fold
+takes numGroups instead of the hard-coded 5, and K-Fold stops when a split has no room left for its
+cv window, where the original loops forever (numJumps much larger than numInputs)
+"""
+
+import itertools
+import warnings
+
+import numpy as np
+import pytest
+
+from tsxv.splitTrain import split_train, split_train_variableInput
+from tsxv.splitTrainVal import split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold
+from tsxv.splitTrainValTest import (split_train_val_test_forwardChaining, split_train_val_test_kFold,
+                                    split_train_val_test_groupKFold)
+
+
+def ref_split_train(sequence, numInputs, numOutputs, numJumps):
+    X, y = list(), list()
+    if (numInputs+numOutputs > len(sequence)):
+        return X, y
+
+    for i in range(len(sequence)):
+        i = numJumps*i
+        end_ix = i + numInputs
+        if end_ix+numOutputs > len(sequence):
+            break
+        X.append(sequence[i:end_ix])
+        y.append(sequence[end_ix:end_ix+numOutputs])
+
+    return X, y
+
+
+def ref_split_train_variableInput(sequence, minSamplesTrain, numOutputs, numJumps):
+    X, y = list(), list()
+    if (minSamplesTrain+numOutputs > len(sequence)):
+        return X, y
+
+    i = 0
+    while 1:
+        end_ix = minSamplesTrain + numJumps*i
+        X.append(sequence[0:end_ix])
+        y.append(sequence[end_ix:end_ix+numOutputs])
+        i += 1
+        if ((minSamplesTrain + numJumps*i + numOutputs) > len(sequence)):
+            break
+
+    return X, y
+
+
+def ref_forwardChaining(sequence, numInputs, numOutputs, numJumps, withTest):
+    numHeldOut = 2 if withTest else 1
+    sets = tuple(dict() for _ in range(2 + 2*numHeldOut))
+    j = 2
+    while 1:
+        windows = [list() for _ in sets]
+        end_ix = 0
+        for i in range(j):
+            start_ix = numJumps*i
+            end_ix = start_ix + numInputs
+            windows[0].append(sequence[start_ix:end_ix])
+            windows[1].append(sequence[end_ix:end_ix+numOutputs])
+
+        if (end_ix + numHeldOut*numInputs + numOutputs > len(sequence)):
+            break
+
+        for k in range(numHeldOut):
+            start_ix = end_ix + k*numInputs
+            windows[2+2*k].append(sequence[start_ix:start_ix+numInputs])
+            windows[3+2*k].append(sequence[start_ix+numInputs:start_ix+numInputs+numOutputs])
+
+        for d, w in zip(sets, windows):
+            d[j-2] = np.array(w)
+        j += 1
+
+    return sets
+
+
+def ref_kFold(sequence, numInputs, numOutputs, numJumps, withTest):
+    numHeldOut = 2 if withTest else 1
+    sets = tuple(dict() for _ in range(2 + 2*numHeldOut))
+    j = 2
+    while 1:
+        windows = [list() for _ in sets]
+        i, n, end_ix, endHeldOut_ix = 0, 0, 0, 0
+        reachedCv = theEnd = False
+        while 1:
+            if (i != j):
+                start_ix = endHeldOut_ix + numJumps*n
+                end_ix = start_ix + numInputs
+                n += 1
+                if end_ix+numOutputs > len(sequence):
+                    break
+                windows[0].append(sequence[start_ix:end_ix])
+                windows[1].append(sequence[end_ix:end_ix+numOutputs])
+            else:
+                reachedCv = True
+                if (end_ix + numHeldOut*numInputs + numOutputs > len(sequence)):
+                    theEnd = True
+                    break
+                n = 0
+                for k in range(numHeldOut):
+                    start_ix = end_ix + k*numInputs
+                    windows[2+2*k].append(sequence[start_ix:start_ix+numInputs])
+                    windows[3+2*k].append(sequence[start_ix+numInputs:start_ix+numInputs+numOutputs])
+                endHeldOut_ix = end_ix + numHeldOut*numInputs
+                if withTest:
+                    i += 1
+            i += 1
+
+        # The original loops forever once a split runs out of sequence before its cv window
+        if (theEnd or not reachedCv):
+            break
+
+        for d, w in zip(sets, windows):
+            d[j-2] = np.array(w)
+        j += 1
+
+    return sets
+
+
+def ref_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups, withTest):
+    numHeldOut = 2 if withTest else 1
+    sets = tuple(dict() for _ in range(2 + 2*numHeldOut))
+    for j in range(numGroups):
+        windows = [list() for _ in sets]
+        i, n, end_ix, endHeldOut_ix = 0, 0, 0, 0
+        while 1:
+            if ((i+1+j) % numGroups != 0):
+                start_ix = endHeldOut_ix + numJumps*n
+                end_ix = start_ix + numInputs
+                n += 1
+                # Without a test set, the original leaves one sample after the last training window
+                if end_ix+numOutputs > len(sequence) - (0 if withTest else 1):
+                    break
+                windows[0].append(sequence[start_ix:end_ix])
+                windows[1].append(sequence[end_ix:end_ix+numOutputs])
+            else:
+                startCv_ix = end_ix
+                if (startCv_ix+numInputs+numOutputs > len(sequence)):
+                    break
+                windows[2].append(sequence[startCv_ix:startCv_ix+numInputs])
+                windows[3].append(sequence[startCv_ix+numInputs:startCv_ix+numInputs+numOutputs])
+                endHeldOut_ix = startCv_ix + numInputs
+                if withTest:
+                    startTest_ix = endHeldOut_ix
+                    if (startTest_ix+numInputs+numOutputs > len(sequence)):
+                        break
+                    windows[4].append(sequence[startTest_ix:startTest_ix+numInputs])
+                    windows[5].append(sequence[startTest_ix+numInputs:startTest_ix+numInputs+numOutputs])
+                    endHeldOut_ix = startTest_ix + numInputs
+                    i += 1
+                n = 0
+            i += 1
+
+        for d, w in zip(sets, windows):
+            d[j] = np.array(w)
+
+    return sets
+
+
+GRID = list(itertools.product([0, 5, 23, 60, 131], [1, 2, 4, 7], [1, 3], [1, 2, 5, 9, 16]))
+
+
+def assert_sets_equal(result, expected, numInputs, numOutputs):
+    assert len(result) == len(expected)
+    for k, (got, want) in enumerate(zip(result, expected)):
+        assert list(got.keys()) == list(want.keys())
+        width = numInputs if k % 2 == 0 else numOutputs
+        for j in want:
+            np.testing.assert_array_equal(np.asarray(got[j]).reshape(-1, width),
+                                          np.asarray(want[j]).reshape(-1, width))
+
+
+def run(splitter, *args, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return splitter(*args, **kwargs)
+
+
+@pytest.mark.parametrize("lenSequence, numInputs, numOutputs, numJumps", GRID)
+def test_split_train(lenSequence, numInputs, numOutputs, numJumps):
+    sequence = np.arange(lenSequence, dtype=float)
+    X, y = run(split_train, sequence, numInputs, numOutputs, numJumps)
+    refX, refY = ref_split_train(sequence, numInputs, numOutputs, numJumps)
+
+    np.testing.assert_array_equal(np.asarray(X).reshape(-1, numInputs), np.asarray(refX).reshape(-1, numInputs))
+    np.testing.assert_array_equal(np.asarray(y).reshape(-1, numOutputs), np.asarray(refY).reshape(-1, numOutputs))
+
+
+@pytest.mark.parametrize("lenSequence, minSamplesTrain, numOutputs, numJumps", GRID)
+def test_split_train_variableInput(lenSequence, minSamplesTrain, numOutputs, numJumps):
+    sequence = np.arange(lenSequence, dtype=float)
+    X, y = run(split_train_variableInput, sequence, minSamplesTrain, numOutputs, numJumps)
+    refX, refY = ref_split_train_variableInput(sequence, minSamplesTrain, numOutputs, numJumps)
+
+    assert len(X) == len(refX) and len(y) == len(refY)
+    for got, want in zip(list(X) + list(y), refX + refY):
+        np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("withTest", [False, True])
+@pytest.mark.parametrize("lenSequence, numInputs, numOutputs, numJumps", GRID)
+def test_forwardChaining(lenSequence, numInputs, numOutputs, numJumps, withTest):
+    sequence = np.arange(lenSequence, dtype=float)
+    splitter = split_train_val_test_forwardChaining if withTest else split_train_val_forwardChaining
+
+    expected = ref_forwardChaining(sequence, numInputs, numOutputs, numJumps, withTest)
+    assert_sets_equal(run(splitter, sequence, numInputs, numOutputs, numJumps), expected, numInputs, numOutputs)
+    assert_sets_equal(run(splitter, sequence, numInputs, numOutputs, numJumps, asViews=True), expected,
+                      numInputs, numOutputs)
+
+
+@pytest.mark.parametrize("withTest", [False, True])
+@pytest.mark.parametrize("lenSequence, numInputs, numOutputs, numJumps", GRID)
+def test_kFold(lenSequence, numInputs, numOutputs, numJumps, withTest):
+    sequence = np.arange(lenSequence, dtype=float)
+    splitter = split_train_val_test_kFold if withTest else split_train_val_kFold
+
+    expected = ref_kFold(sequence, numInputs, numOutputs, numJumps, withTest)
+    assert_sets_equal(run(splitter, sequence, numInputs, numOutputs, numJumps), expected, numInputs, numOutputs)
+
+
+@pytest.mark.parametrize("withTest", [False, True])
+@pytest.mark.parametrize("numGroups", [3, 4, 5, 7])
+@pytest.mark.parametrize("lenSequence, numInputs, numOutputs, numJumps", GRID)
+def test_groupKFold(lenSequence, numInputs, numOutputs, numJumps, numGroups, withTest):
+    sequence = np.arange(lenSequence, dtype=float)
+    splitter = split_train_val_test_groupKFold if withTest else split_train_val_groupKFold
+
+    expected = ref_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups, withTest)
+    result = run(splitter, sequence, numInputs, numOutputs, numJumps, numGroups)
+    assert_sets_equal(result, expected, numInputs, numOutputs)
+
+    # The shared storage gathers the same windows
+    shared = run(splitter, sequence, numInputs, numOutputs, numJumps, numGroups, asShared=True)
+    folds = [shared.fold(j) for j in range(len(shared))]
+    assert_sets_equal(tuple({j: fold[k] for j, fold in enumerate(folds)} for k in range(len(expected))), expected,
+                      numInputs, numOutputs)
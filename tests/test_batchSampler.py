@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from tsxv.batchSampler import BatchSampler, WindowDataset
+from tsxv.splitTrain import split_train
+from tsxv.splitTrainVal import plan_train_val_kFold
+
+
+def epoch(sampler):
+    """ Copies every batch of one epoch, since the sampler reuses its buffers """
+
+    return [(X.copy(), y.copy()) for X, y in sampler]
+
+
+def test_dataset_matches_split_train():
+    sequence = np.random.default_rng(0).standard_normal((200, 2))
+    dataset = WindowDataset.from_split_train(sequence, 7, 3, 4)
+    X, y = split_train(sequence, 7, 3, 4)
+
+    assert len(dataset) == len(X)
+    np.testing.assert_array_equal(dataset[np.arange(len(dataset))][0], X)
+    np.testing.assert_array_equal(dataset[np.arange(len(dataset))][1], y)
+
+    Xi, yi = dataset[5]
+    np.testing.assert_array_equal(Xi, X[5])
+    np.testing.assert_array_equal(yi, y[5])
+    assert np.shares_memory(Xi, sequence)
+
+
+@pytest.mark.parametrize("subset", ["train", "cv"])
+def test_dataset_from_plan_matches_fold(subset):
+    sequence = np.random.default_rng(1).standard_normal(300)
+    plan = plan_train_val_kFold(sequence, 6, 2, 5, dilation=2, targetDilation=3)
+    dataset = WindowDataset.from_plan(plan, 4, sequence, subset)
+    fold = plan.fold(4, sequence)
+    X, y = fold[:2] if subset == "train" else fold[2:4]
+
+    got = dataset[np.arange(len(dataset))]
+    np.testing.assert_array_equal(got[0], X)
+    np.testing.assert_array_equal(got[1], y)
+
+    with pytest.raises(ValueError):
+        WindowDataset.from_plan(plan, 4, sequence, "test")
+
+
+@pytest.mark.parametrize("batchSize, dropLast", [(1, False), (16, False), (16, True), (1000, False)])
+def test_each_window_once_per_epoch(batchSize, dropLast):
+    sequence = np.arange(500.)
+    dataset = WindowDataset.from_split_train(sequence, 10, 2, 3, dilation=2)
+    sampler = BatchSampler(dataset, batchSize, dropLast=dropLast, prefetch=1, seed=0)
+
+    batches = epoch(sampler)
+    assert len(batches) == len(sampler)
+    assert all(len(X) == batchSize for X, _ in (batches if dropLast else batches[:-1]))
+
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+
+    # Windows start at their first value, so this lists the windows drawn
+    drawn = np.searchsorted(dataset.starts, X[:, 0])
+    assert len(np.unique(drawn)) == len(drawn)
+    np.testing.assert_array_equal(X, dataset[drawn][0])
+    np.testing.assert_array_equal(y, dataset[drawn][1])
+    assert len(drawn) == (len(dataset)//batchSize*batchSize if dropLast else len(dataset))
+
+
+def test_shuffle_and_seed():
+    dataset = WindowDataset.from_split_train(np.arange(400.), 5, 1, 1)
+
+    ordered = epoch(BatchSampler(dataset, 32, shuffle=False))
+    np.testing.assert_array_equal(np.concatenate([X for X, _ in ordered])[:, 0], dataset.starts)
+
+    first, second = epoch(BatchSampler(dataset, 32, seed=3)), epoch(BatchSampler(dataset, 32, seed=3))
+    for (X1, y1), (X2, y2) in zip(first, second):
+        np.testing.assert_array_equal(X1, X2)
+        np.testing.assert_array_equal(y1, y2)
+
+    # A new order at each epoch
+    sampler = BatchSampler(dataset, 32, seed=3)
+    assert not np.array_equal(epoch(sampler)[0][0], epoch(sampler)[0][0])
+
+
+def test_early_exit_stops_the_worker():
+    sampler = BatchSampler(WindowDataset.from_split_train(np.arange(1000.), 5, 1, 1), 4, prefetch=1)
+    for _ in sampler:
+        break
+    assert len(epoch(sampler)) == len(sampler)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        WindowDataset(np.arange(10.), [0, 6], 4, 2)
+    with pytest.raises(ValueError):
+        BatchSampler(WindowDataset(np.arange(10.), [0], 4, 2), 0)
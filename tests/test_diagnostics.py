@@ -0,0 +1,55 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from tsxv.diagnostics import ShortSequenceWarning, add_hook, remove_hook
+from tsxv.splitEstimate import estimate_split
+from tsxv.splitTrain import split_train, split_train_panel
+from tsxv.splitTrainVal import split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold
+
+
+@pytest.fixture
+def reports():
+    received = list()
+    add_hook(received.append)
+    yield received
+    remove_hook(received.append)
+
+
+def test_views_take_no_bytes(reports):
+    split_train(np.random.default_rng(0).standard_normal(10000), 10, 1, 1)
+    assert reports[-1].outputBytes == 0
+    assert reports[-1].numWindows == 9990
+
+
+def test_cast_copy_is_counted(reports):
+    sequence = np.random.default_rng(0).standard_normal(100000)
+
+    split_train(sequence, 10, 1, 1, dtype=np.float32)
+    assert reports[-1].outputBytes == sequence.astype(np.float32).nbytes
+
+    split_train_panel(sequence.reshape(10, -1), 10, 1, 1, asViews=True, dtype=np.float32)
+    assert reports[-1].outputBytes >= sequence.astype(np.float32).nbytes
+
+    split_train_val_forwardChaining(sequence[:2000], 10, 1, 5, asViews=True, dtype=np.float32)
+    estimate = estimate_split(split_train_val_forwardChaining, sequence[:2000], 10, 1, 5, asViews=True, dtype=np.float32)
+    assert reports[-1].outputBytes == estimate.outputBytes == 2000*4
+
+
+def test_copies_are_counted(reports):
+    sequence = np.arange(300.)
+    X, y, Xcv, ycv = split_train_val_kFold(sequence, 5, 1, 7)
+    assert reports[-1].outputBytes == sum(a.nbytes for d in (X, y, Xcv, ycv) for a in d.values())
+    assert reports[-1].numFolds == len(X)
+
+
+@pytest.mark.parametrize("splitter", [split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold])
+def test_short_sequence_warns(splitter):
+    with pytest.warns(ShortSequenceWarning) as record:
+        splitter(np.arange(5.), 3, 2, 1)
+    assert record[0].message.lenSequence == 5
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        splitter(np.arange(100.), 3, 2, 1)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from tsxv.liveSplit import LiveSplitter
+from tsxv.splitTrain import split_train
+from tsxv.splitTrainVal import split_train_val_forwardChaining
+from tsxv.splitTrainValTest import split_train_val_test_forwardChaining
+
+
+def chunks(sequence, sizes):
+    begin = 0
+    for size in sizes:
+        yield sequence[begin:begin+size]
+        begin += size
+
+
+@pytest.mark.parametrize("numInputs, numOutputs, numJumps", [(4, 2, 1), (3, 1, 5), (5, 3, 2)])
+def test_appended_sets_match_split_train(numInputs, numOutputs, numJumps):
+    sequence = np.random.default_rng(0).standard_normal(200)
+    live = LiveSplitter(sequence[:7], numInputs, numOutputs, numJumps)
+    parts = [live.append()] + [live.append(chunk) for chunk in chunks(sequence[7:], [1, 0, 13, 2, 50, 127])]
+
+    X, y = split_train(sequence, numInputs, numOutputs, numJumps)
+    np.testing.assert_array_equal(np.concatenate([part[0] for part in parts]), X)
+    np.testing.assert_array_equal(np.concatenate([part[1] for part in parts]), y)
+
+
+@pytest.mark.parametrize("withTest", [False, True])
+@pytest.mark.parametrize("numInputs, numOutputs, numJumps", [(4, 2, 1), (3, 1, 5), (5, 3, 2)])
+def test_appended_splits_match_forward_chaining(numInputs, numOutputs, numJumps, withTest):
+    sequence = np.random.default_rng(1).standard_normal(150)
+    live = LiveSplitter(sequence[:10], numInputs, numOutputs, numJumps, withTest=withTest)
+    parts = [live.append_forwardChaining()]
+    parts += [live.append_forwardChaining(chunk) for chunk in chunks(sequence[10:], [3, 0, 40, 1, 96])]
+
+    splitter = split_train_val_test_forwardChaining if withTest else split_train_val_forwardChaining
+    expected = splitter(sequence, numInputs, numOutputs, numJumps)
+    for k, folds in enumerate(expected):
+        merged = {j: windows for part in parts for j, windows in part[k].items()}
+        assert sorted(merged) == sorted(folds)
+        for j in folds:
+            np.testing.assert_array_equal(merged[j], folds[j])
+
+
+def test_views_stay_valid_when_the_buffer_grows():
+    live = LiveSplitter(np.arange(10.), 3, 1, 1)
+    X, _ = live.append()
+    live.append(np.arange(10., 1000.))
+    np.testing.assert_array_equal(X[0], [0, 1, 2])
+    assert not X.flags.writeable
+
+
+def test_buffer_is_upcast_for_wider_samples():
+    live = LiveSplitter(np.arange(10), 3, 1, 1)
+    live.append()
+    X, y = live.append([1.5, 2.7])
+
+    np.testing.assert_array_equal(live.sequence[-2:], [1.5, 2.7])
+    np.testing.assert_array_equal(y[-1], [2.7])
+
+    live.append(())
+    assert live.sequence.dtype == np.float64
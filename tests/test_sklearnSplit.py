@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from tsxv.sklearnSplit import (ForwardChaining, KFold, GroupKFold, ForwardChainingWithTest, KFoldWithTest,
+                               GroupKFoldWithTest)
+from tsxv.splitTrain import split_train
+from tsxv.splitTrainVal import split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold
+from tsxv.splitTrainValTest import (split_train_val_test_forwardChaining, split_train_val_test_kFold,
+                                    split_train_val_test_groupKFold)
+
+CASES = [
+    (ForwardChaining, split_train_val_forwardChaining, {}),
+    (KFold, split_train_val_kFold, {}),
+    (GroupKFold, split_train_val_groupKFold, {"numGroups": 4}),
+    (ForwardChainingWithTest, split_train_val_test_forwardChaining, {}),
+    (KFoldWithTest, split_train_val_test_kFold, {}),
+    (GroupKFoldWithTest, split_train_val_test_groupKFold, {"numGroups": 6}),
+]
+
+
+@pytest.mark.parametrize("numInputs, numOutputs, numJumps", [(4, 2, 3), (6, 1, 1), (3, 3, 8)])
+@pytest.mark.parametrize("cvClass, splitter, kwargs", CASES)
+def test_indices_select_the_splitter_windows(cvClass, splitter, kwargs, numInputs, numOutputs, numJumps):
+    sequence = np.random.default_rng(0).standard_normal(120)
+    X, y = split_train(sequence, numInputs, numOutputs, 1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = splitter(sequence, numInputs, numOutputs, numJumps, **kwargs)
+
+    cv = cvClass(numInputs, numOutputs, numJumps, **kwargs)
+    splits = list(cv.split_with_test(X) if hasattr(cv, "split_with_test") else cv.split(X))
+
+    assert cv.get_n_splits(X) == len(splits) == len(expected[0])
+    for j, indices in enumerate(splits):
+        for k, rows in enumerate(indices):
+            np.testing.assert_array_equal(X[rows], np.asarray(expected[2*k][j]).reshape(-1, numInputs))
+            np.testing.assert_array_equal(y[rows], np.asarray(expected[2*k+1][j]).reshape(-1, numOutputs))
+
+
+def test_split_leaves_the_test_set_out():
+    X, _ = split_train(np.arange(100.), 4, 2, 1)
+    cv = KFoldWithTest(4, 2, 3)
+    for (train, val), (train2, val2, test) in zip(cv.split(X), cv.split_with_test(X)):
+        np.testing.assert_array_equal(train, train2)
+        np.testing.assert_array_equal(val, val2)
+        assert not np.intersect1d(train, test).size
+
+
+def test_get_n_splits_needs_X():
+    with pytest.raises(ValueError):
+        KFold(4, 2, 3).get_n_splits()
+    assert KFold(4, 2, 3).get_n_splits(np.empty((0, 4))) == 0
+
+
+def test_cross_validate():
+    pytest.importorskip("sklearn")
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import cross_validate
+
+    X, y = split_train(np.sin(np.arange(300)/10), 8, 1, 1)
+    scores = cross_validate(LinearRegression(), X, y.ravel(), cv=GroupKFold(8, 1, 2), scoring="neg_mean_squared_error")
+    assert len(scores["test_score"]) == 5
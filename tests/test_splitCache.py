@@ -0,0 +1,89 @@
+import numpy as np
+
+from tsxv.splitCache import SplitCache, fingerprint
+from tsxv.splitTrain import split_train
+from tsxv.splitTrainVal import split_train_val_kFold
+
+
+def test_hit_on_equal_content():
+    sequence = np.arange(1000.)
+    cache = SplitCache()
+    first = cache(split_train_val_kFold, sequence, 5, 1, 20)
+    second = cache(split_train_val_kFold, sequence.copy(), 5, 1, 20)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second is first
+    assert not first[0][0].flags.writeable
+
+
+def test_miss_on_one_edited_sample():
+    a = np.arange(1e5)
+    b = a.copy()
+    b[2] = -999
+
+    cache = SplitCache()
+    cache(split_train_val_kFold, a, 5, 1, 20000)
+    X = cache(split_train_val_kFold, b, 5, 1, 20000)[0]
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    np.testing.assert_array_equal(X[0][0], [0, 1, -999, 3, 4])
+    assert fingerprint(a) != fingerprint(b)
+
+
+def test_sampled_fingerprint_is_opt_in():
+    a = np.arange(1e5)
+    b = a.copy()
+    b[2] = -999
+
+    assert fingerprint(a, sampled=True) == fingerprint(b, sampled=True)
+    assert fingerprint(a) != fingerprint(a, sampled=True)
+
+
+def test_miss_on_other_parameters():
+    sequence = np.arange(100.)
+    cache = SplitCache()
+    cache(split_train, sequence, 5, 1, 1)
+    cache(split_train, sequence, 5, 1, 2)
+    cache(split_train, sequence, 5, 1, numJumps=1)
+
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_views_take_no_room():
+    sequence = np.random.default_rng(0).standard_normal(10000)
+    cache = SplitCache(maxBytes=10**6)
+    cache(split_train, sequence, 200, 10, 1)
+
+    assert len(cache) == 1
+
+
+def test_eviction_keeps_bytes_under_limit():
+    sequence = np.arange(200.)
+    size = split_train_val_kFold(sequence, 5, 1, 10)[0][0].nbytes
+    cache = SplitCache(maxBytes=40*size)
+    for numJumps in range(5, 15):
+        cache(split_train_val_kFold, sequence, 5, 1, numJumps)
+
+    assert cache._bytes <= cache.maxBytes
+    assert 0 < len(cache) < 10
+
+
+def test_directory_survives_restart(tmp_path):
+    sequence = np.random.default_rng(0).standard_normal(2000)
+    X, y = SplitCache(directory=str(tmp_path))(split_train, sequence, 100, 10, 1)
+
+    # Views are stored as their layout over the sequence, not as the windows themselves
+    assert not list(tmp_path.rglob("*.npy"))
+
+    folds = SplitCache(directory=str(tmp_path))(split_train_val_kFold, sequence, 10, 2, 50)
+
+    cache = SplitCache(directory=str(tmp_path))
+    X2, y2 = cache(split_train, sequence.copy(), 100, 10, 1)
+    folds2 = cache(split_train_val_kFold, sequence.copy(), 10, 2, 50)
+
+    assert (cache.hits, cache.misses) == (2, 0)
+    np.testing.assert_array_equal(X2, X)
+    np.testing.assert_array_equal(y2, y)
+    for d, d2 in zip(folds, folds2):
+        for j in d:
+            np.testing.assert_array_equal(d2[j], d[j])
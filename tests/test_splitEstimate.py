@@ -0,0 +1,85 @@
+import itertools
+import warnings
+
+import numpy as np
+import pytest
+
+from tsxv.splitEstimate import estimate_split
+from tsxv.splitTrainVal import split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold
+from tsxv.splitTrainValTest import (split_train_val_test_forwardChaining, split_train_val_test_kFold,
+                                    split_train_val_test_groupKFold)
+
+SPLITTERS = [split_train_val_forwardChaining, split_train_val_kFold, split_train_val_groupKFold,
+             split_train_val_test_forwardChaining, split_train_val_test_kFold, split_train_val_test_groupKFold]
+GRID = list(itertools.product([0, 9, 40, 113], [1, 3, 6], [1, 2], [1, 2, 7]))
+
+
+def run(splitter, *args, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return splitter(*args, **kwargs)
+
+
+def owned_bytes(result, sequence):
+    return sum(a.nbytes for d in result for a in d.values() if not np.may_share_memory(a, sequence))
+
+
+@pytest.mark.parametrize("splitter", SPLITTERS)
+@pytest.mark.parametrize("lenSequence, numInputs, numOutputs, numJumps", GRID)
+def test_estimate_matches_output(splitter, lenSequence, numInputs, numOutputs, numJumps):
+    sequence = np.random.default_rng(0).standard_normal((lenSequence, 2))
+    kwargs = {"numGroups": 4} if "group" in splitter.__name__ else {}
+    result = run(splitter, sequence, numInputs, numOutputs, numJumps, **kwargs)
+    estimate = estimate_split(splitter, sequence, numInputs, numOutputs, numJumps, **kwargs)
+
+    assert estimate.numFolds == len(result[0])
+    np.testing.assert_array_equal(estimate.trainWindows, [len(result[0][j]) for j in result[0]])
+    np.testing.assert_array_equal(estimate.cvWindows, [len(result[2][j]) for j in result[2]])
+    if len(result) == 6:
+        np.testing.assert_array_equal(estimate.testWindows, [len(result[4][j]) for j in result[4]])
+    else:
+        assert estimate.testWindows is None
+    assert estimate.outputBytes == owned_bytes(result, sequence)
+
+    # A length gives the same counts
+    assert estimate_split(splitter, lenSequence, numInputs, numOutputs, numJumps, **kwargs).numFolds == estimate.numFolds
+
+
+@pytest.mark.parametrize("splitter", SPLITTERS)
+def test_options_match_output(splitter):
+    sequence = np.random.default_rng(1).standard_normal(150)
+    kwargs = {"numGroups": 3} if "group" in splitter.__name__ else {}
+
+    for options in [{"dtype": np.float32}, {"dilation": 2, "targetDilation": 3}]:
+        result = run(splitter, sequence, 4, 2, 3, **kwargs, **options)
+        assert estimate_split(splitter, sequence, 4, 2, 3, **kwargs, **options).outputBytes == owned_bytes(result, sequence)
+
+    if "forwardChaining" in splitter.__name__:
+        # Views own nothing, views over a cast copy own the copy
+        result = run(splitter, sequence, 4, 2, 3, asViews=True)
+        assert owned_bytes(result, sequence) == 0
+        assert estimate_split(splitter, sequence, 4, 2, 3, asViews=True).outputBytes == 0
+
+        result = run(splitter, sequence, 4, 2, 3, asViews=True, dtype=np.float32)
+        copy = result[0][0].base
+        while copy.base is not None:
+            copy = copy.base
+        assert estimate_split(splitter, sequence, 4, 2, 3, asViews=True, dtype=np.float32).outputBytes == copy.nbytes
+    else:
+        shared = run(splitter, sequence, 4, 2, 3, asShared=True, **kwargs)
+        assert estimate_split(splitter, sequence, 4, 2, 3, asShared=True, **kwargs).outputBytes == shared.nbytes
+
+
+def test_memory_budget():
+    with pytest.raises(MemoryError):
+        estimate_split(split_train_val_kFold, 10**6, 100, 10, 1, memoryBudget=2**30)
+    assert estimate_split(split_train_val_kFold, 10**6, 100, 10, 10**4, memoryBudget=2**30).numFolds == 99
+
+
+def test_unknown_splitter_and_options():
+    with pytest.raises(ValueError):
+        estimate_split(estimate_split, 100, 4, 2, 1)
+    with pytest.raises(ValueError):
+        estimate_split(split_train_val_kFold, 100, 4, 2, 1, asViews=True)
+    with pytest.raises(ValueError):
+        estimate_split(split_train_val_forwardChaining, 100, 4, 2, 1, asShared=True)
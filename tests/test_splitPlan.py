@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+from tsxv.splitPlan import compact_starts, index_dtype
+from tsxv.splitTrainVal import plan_train_val_forwardChaining, plan_train_val_kFold, plan_train_val_groupKFold
+from tsxv.splitTrainValTest import (plan_train_val_test_forwardChaining, plan_train_val_test_kFold,
+                                    plan_train_val_test_groupKFold)
+
+PLANNERS = [plan_train_val_forwardChaining, plan_train_val_kFold, plan_train_val_groupKFold,
+            plan_train_val_test_forwardChaining, plan_train_val_test_kFold, plan_train_val_test_groupKFold]
+
+
+def reference_fold(plan, j, sequence):
+    """ Windows of split j sliced one at a time """
+
+    sets = [plan.trainStarts, plan.cvStarts] + ([] if plan.testStarts is None else [plan.testStarts])
+    windows = list()
+    for folds in sets:
+        for offset, width, dilation in [(0, plan.numInputs, plan.dilation),
+                                        (plan.numInputs*plan.dilation, plan.numOutputs, plan.targetDilation)]:
+            windows.append(np.array([sequence[s+offset:s+offset+(width-1)*dilation+1:dilation] for s in folds[j]])
+                           .reshape((-1, width) + sequence.shape[1:]))
+    return windows
+
+
+@pytest.mark.parametrize("planner", PLANNERS)
+@pytest.mark.parametrize("dilation, targetDilation", [(1, 1), (2, 3)])
+def test_fold_matches_reference(planner, dilation, targetDilation):
+    sequence = np.random.default_rng(0).standard_normal((180, 2))
+    plan = planner(sequence, 6, 2, 4, dilation=dilation, targetDilation=targetDilation)
+
+    assert len(plan) > 0
+    for j in range(len(plan)):
+        for got, want in zip(plan.fold(j, sequence), reference_fold(plan, j, sequence)):
+            np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("planner", PLANNERS)
+def test_shared_folds_match_materialize(planner):
+    sequence = np.random.default_rng(1).standard_normal(250)
+    plan = planner(sequence, 7, 3, 2, dilation=2)
+
+    for dtype in [None, np.float32]:
+        sets = plan.materialize(sequence, dtype)
+        shared = plan.share(sequence, dtype)
+
+        assert len(shared) == len(plan) == len(sets[0])
+        assert (shared.testIndex is None) == (plan.testStarts is None)
+        for j in range(len(plan)):
+            for got, d in zip(shared.fold(j), sets):
+                assert got.dtype == d[j].dtype
+                np.testing.assert_array_equal(got, d[j])
+
+        for (j, *subsets), (k, *sharedSubsets) in zip(plan.iter_folds(sequence, dtype), shared.iter_folds()):
+            assert j == k
+            for (X, y), (Xs, ys) in zip(subsets, sharedSubsets):
+                np.testing.assert_array_equal(X, Xs)
+                np.testing.assert_array_equal(y, ys)
+
+
+def test_shared_folds_store_each_window_once():
+    sequence = np.random.default_rng(2).standard_normal(1000)
+    plan = plan_train_val_kFold(sequence, 20, 5, 1)
+    shared = plan.share(sequence)
+
+    starts = np.unique(np.concatenate(plan.trainStarts + plan.cvStarts))
+    assert len(shared.X) == len(starts)
+    assert all(index.dtype == index_dtype(len(starts)) for index in shared.trainIndex + shared.cvIndex)
+
+    indices = shared.trainIndex + shared.cvIndex
+    assert shared.nbytes == shared.X.nbytes + shared.y.nbytes + sum(index.nbytes for index in indices)
+    assert shared.nbytes < sum(d[j].nbytes for d in plan.materialize(sequence) for j in d)
+
+
+@pytest.mark.parametrize("planner", [plan_train_val_kFold, plan_train_val_test_groupKFold])
+def test_save_fold_matches_fold(planner, tmp_path):
+    sequence = np.random.default_rng(3).standard_normal((300, 3))
+    path = os.path.join(str(tmp_path), "sequence.npy")
+    np.save(path, sequence)
+    plan = planner(sequence, 8, 2, 5)
+
+    for source in [sequence, path]:
+        saved = plan.save_fold(2, source, str(tmp_path / "fold"), dtype=np.float32)
+        names = ["X", "y", "Xcv", "ycv", "Xtest", "ytest"][:len(saved)]
+        for name, got, want in zip(names, saved, plan.fold(2, sequence, np.float32)):
+            np.testing.assert_array_equal(got, want)
+            np.testing.assert_array_equal(np.load(str(tmp_path / "fold" / (name + ".npy"))), want)
+
+
+def test_empty_plan():
+    plan = plan_train_val_kFold(5, 4, 2, 1)
+    assert len(plan) == 0
+    assert plan.materialize(np.arange(5.)) == ({}, {}, {}, {})
+    assert len(plan.share(np.arange(5.)).X) == 0
+
+
+def test_compact_starts():
+    assert compact_starts([0, 5, 9], 100).dtype == index_dtype(100)
@@ -0,0 +1,97 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from tsxv.diagnostics import ShortSequenceWarning
+from tsxv.splitTime import plan_time, split_time
+from tsxv.splitTrainVal import plan_train_val_forwardChaining, plan_train_val_kFold, plan_train_val_groupKFold
+from tsxv.splitTrainValTest import plan_train_val_test_forwardChaining, plan_train_val_test_groupKFold
+
+PLANNERS = [plan_train_val_forwardChaining, plan_train_val_kFold, plan_train_val_groupKFold,
+            plan_train_val_test_forwardChaining, plan_train_val_test_groupKFold]
+
+
+def reference_bounds(times, starts, numInputs, numOutputs):
+    """ Sample boundaries of each window, found one sample at a time, empty windows dropped """
+
+    bounds = list()
+    for s in starts:
+        inputs = [i for i, t in enumerate(times) if s <= t < s+numInputs]
+        outputs = [i for i, t in enumerate(times) if s+numInputs <= t < s+numInputs+numOutputs]
+        if inputs and outputs:
+            bounds.append((inputs[0], outputs[0], outputs[-1]+1))
+    return np.array(bounds, dtype=int).reshape(-1, 3)
+
+
+@pytest.mark.parametrize("planner", PLANNERS)
+def test_regular_index_matches_sample_plan(planner):
+    plan = planner(60, 5, 2, 3)
+    timePlan = plan_time(planner, np.arange(60), 5, 2, 3)
+
+    assert len(timePlan) == len(plan)
+    for starts, bounds in zip(plan.trainStarts + plan.cvStarts, timePlan.trainBounds + timePlan.cvBounds):
+        np.testing.assert_array_equal(bounds, np.stack((starts, starts+5, starts+7), axis=1))
+
+
+@pytest.mark.parametrize("planner", PLANNERS)
+def test_irregular_index_matches_reference(planner):
+    rng = np.random.default_rng(0)
+    times = np.sort(rng.choice(400, 150, replace=False))
+    lenTime = int(times[-1]) + 1
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        timePlan = plan_time(planner, times, 12, 4, 5)
+    plan = planner(lenTime, 12, 4, 5)
+
+    sets = [plan.trainStarts, plan.cvStarts] + ([] if plan.testStarts is None else [plan.testStarts])
+    expected = [[reference_bounds(times, starts, 12, 4) for starts in folds] for folds in sets]
+    kept = [j for j in range(len(plan)) if all(len(folds[j]) for folds in expected)]
+
+    timeSets = [timePlan.trainBounds, timePlan.cvBounds] + ([] if timePlan.testBounds is None else [timePlan.testBounds])
+    assert len(timePlan) == len(kept)
+    for folds, timeFolds in zip(expected, timeSets):
+        for j, bounds in zip(kept, timeFolds):
+            np.testing.assert_array_equal(bounds, folds[j])
+
+
+def test_forward_chaining_bounds_share_one_array():
+    plan = plan_time(plan_train_val_forwardChaining, np.arange(0, 10000, 3), 30, 3, 20)
+    assert np.shares_memory(plan.trainBounds[0], plan.trainBounds[-1])
+
+
+def test_folds_without_held_out_windows_are_dropped_with_a_warning():
+    days = np.arange("2020-01-01", "2021-01-01", dtype="datetime64[D]")
+    businessDays = days[np.is_busday(days)]
+    D = lambda n: np.timedelta64(n, "D")
+
+    # Every 1 day target lands on a Sunday
+    with pytest.warns(ShortSequenceWarning, match="43 of 43"):
+        assert len(plan_time(plan_train_val_kFold, businessDays, D(30), D(1), D(7))) == 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        plan = plan_time(plan_train_val_kFold, businessDays, D(30), D(3), D(7))
+    assert len(plan) == 43
+    assert all(len(bounds) == 1 for bounds in plan.cvBounds)
+
+    kept = plan_time(plan_train_val_kFold, businessDays, D(30), D(1), D(7), dropEmpty=False)
+    assert len(kept) == 43
+
+
+def test_split_time_returns_views():
+    times = np.arange("2021-01-01T00", "2021-01-08T00", dtype="datetime64[h]")[::2]
+    sequence = np.arange(len(times), dtype=float)
+    X, y, Xcv, ycv = split_time(plan_train_val_forwardChaining, sequence, times,
+                                np.timedelta64(6, "h"), np.timedelta64(2, "h"), np.timedelta64(4, "h"))
+
+    assert len(X) > 0
+    np.testing.assert_array_equal(X[0][0], [0, 1, 2])
+    np.testing.assert_array_equal(y[0][0], [3])
+    assert np.shares_memory(X[0][0], sequence)
+
+
+def test_unsorted_timestamps_raise():
+    with pytest.raises(ValueError):
+        plan_time(plan_train_val_kFold, np.array([0, 2, 1]), 1, 1, 1)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from tsxv.splitTrain import split_train
+from tsxv.splitTrainVal import plan_train_val_kFold
+from tsxv.splitTrainValTest import plan_train_val_test_forwardChaining
+from tsxv.windowStats import fold_stats, normalize_fold, scale_windows, window_stats
+
+
+def gather(sequence, starts, width, dilation=1):
+    return np.stack([sequence[s:s+(width-1)*dilation+1:dilation] for s in starts])
+
+
+def test_trending_series_matches_numpy():
+    rng = np.random.default_rng(0)
+    sequence = np.linspace(100, 10000, 2000000) + rng.normal(0, 0.01, 2000000)
+    starts = rng.integers(0, len(sequence)-20, 2000)
+
+    stats = window_stats(sequence, starts, 20)
+    windows = gather(sequence, starts, 20)
+
+    np.testing.assert_allclose(stats.std, windows.std(axis=1), rtol=1e-9)
+    np.testing.assert_allclose(stats.mean, windows.mean(axis=1), rtol=1e-12)
+    assert np.all(stats.std > 0)
+
+
+@pytest.mark.parametrize("width, dilation", [(1, 1), (2, 1), (3, 2), (7, 3), (50, 1), (5, 7)])
+def test_multivariate_dilated_windows_match_numpy(width, dilation):
+    sequence = np.random.default_rng(1).standard_normal((500, 3)).cumsum(axis=0)*100 + 1e4
+    starts = np.arange(0, len(sequence)-(width-1)*dilation, 3)
+
+    stats = window_stats(sequence, starts, width, dilation)
+    windows = gather(sequence, starts, width, dilation)
+
+    np.testing.assert_allclose(stats.mean, windows.mean(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(stats.std, windows.std(axis=1), rtol=1e-7, atol=1e-9)
+    np.testing.assert_array_equal(stats.min, windows.min(axis=1))
+    np.testing.assert_array_equal(stats.max, windows.max(axis=1))
+
+
+def test_width_one_and_constant_windows_have_zero_std():
+    sequence = np.random.default_rng(2).uniform(0, 100, 100000)
+    assert np.all(window_stats(sequence, np.arange(len(sequence)), 1).std == 0)
+    assert np.all(window_stats(np.full(1000, 3.3), [10, 500], 4).std == 0)
+
+
+def test_empty_starts():
+    stats = window_stats(np.arange(10.), [], 3)
+    assert stats.mean.shape == (0,)
+
+
+def test_split_train_with_stats():
+    sequence = np.random.default_rng(3).standard_normal(300)
+    X, y, stats = split_train(sequence, 10, 2, 3, withStats=True)
+
+    np.testing.assert_allclose(stats.mean, X.mean(axis=1))
+    np.testing.assert_allclose(stats.std, X.std(axis=1))
+
+
+def test_fold_stats_match_training_inputs():
+    sequence = np.linspace(0, 1000, 400) + np.random.default_rng(4).standard_normal(400)
+    plan = plan_train_val_kFold(sequence, 8, 2, 5)
+    X = plan.fold(3, sequence)[0]
+
+    stats = fold_stats(plan, 3, sequence)
+    np.testing.assert_allclose(stats.mean, X.mean())
+    np.testing.assert_allclose(stats.std, X.std())
+    assert (stats.min, stats.max) == (X.min(), X.max())
+
+
+def test_normalize_fold_scales_by_fold_stats():
+    sequence = np.random.default_rng(5).standard_normal((300, 2)) + 50
+    plan = plan_train_val_test_forwardChaining(sequence, 6, 2, 4)
+    windows, stats = normalize_fold(plan, 5, sequence)
+    raw = plan.fold(5, sequence)
+
+    assert len(windows) == 6
+    for scaled, original in zip(windows, raw):
+        np.testing.assert_allclose(scaled, (original - stats.mean)/stats.std, rtol=1e-6)
+    np.testing.assert_allclose(windows[0].mean(axis=(0, 1)), 0, atol=1e-6)
+
+
+def test_scale_windows_per_window_and_zero_std():
+    sequence = np.concatenate((np.full(10, 2.), np.arange(20.)))
+    starts = np.array([0, 12, 20])
+    stats = window_stats(sequence, starts, 5)
+    scaled = scale_windows(sequence, starts, 5, stats.mean, stats.std)
+
+    np.testing.assert_array_equal(scaled[0], 0)
+    np.testing.assert_allclose(scaled[1:].std(axis=1), 1)
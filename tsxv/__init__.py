@@ -1 +1 @@
-__all__ = ['splitTrain', 'splitTrainVal', 'splitTrainValTest']
+__all__ = ['batchSampler', 'diagnostics', 'evaluate', 'liveSplit', 'splitCache', 'splitEstimate', 'splitTrain', 'splitTrainVal', 'splitTrainValTest', 'splitPlan', 'splitSweep', 'splitTime', 'sklearnSplit', 'windowStats', 'windows']
@@ -0,0 +1,196 @@
+"""
+Shuffled mini-batches of windows gathered on the fly into reused buffers, with background prefetching
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+from .windows import as_sequence, strided_windows, window_count, window_span
+
+
+class WindowDataset:
+    """ Dataset of (X, y) windows computed on the fly from their start offsets, never stored
+        i.e. dataset[k] = (sequence[s:s+numInputs], sequence[s+numInputs:s+numInputs+numOutputs]) with s = starts[k],
+             inputs taken every dilation samples and outputs every targetDilation samples
+
+        Integer indexing returns read-only views over the sequence, any other index (slice, array)
+        returns the gathered windows as new arrays
+
+    Attributes:
+        sequence (array)    : Full training dataset
+        starts (array)      : Index of the first sample of each window
+        numInputs (int)     : Number of inputs X of each window
+        numOutputs (int)    : Number of outputs y of each window
+        dilation (int)      : Number of sequence samples between consecutive inputs
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    """
+
+    def __init__(self, sequence, starts, numInputs, numOutputs, dilation=1, targetDilation=1):
+        self.sequence = as_sequence(sequence)
+        self.starts = np.asarray(starts, dtype=np.intp).reshape(-1)
+        self.numInputs = numInputs
+        self.numOutputs = numOutputs
+        self.dilation = dilation
+        self.targetDilation = targetDilation
+
+        if (len(self.starts) > 0 and (self.starts.min() < 0 or self.starts.max()+numInputs*dilation
+                                      + window_span(numOutputs, targetDilation) > len(self.sequence))):
+            raise ValueError("The requested windows do not fit in the sequence")
+
+    @classmethod
+    def from_split_train(cls, sequence, numInputs, numOutputs, numJumps, dilation=1, targetDilation=1):
+        """ Returns the dataset of the (X,y) sets of split_train """
+
+        sequence = as_sequence(sequence)
+        numSets = window_count(len(sequence), numInputs*dilation+numOutputs*targetDilation, numJumps)
+        return cls(sequence, np.arange(numSets)*numJumps, numInputs, numOutputs, dilation, targetDilation)
+
+    @classmethod
+    def from_plan(cls, plan, j, sequence, subset="train"):
+        """ Returns the dataset of the training, cv or test windows of split j of a SplitPlan
+
+        Parameters:
+            plan (SplitPlan)  : Plan returned by one of the plan_* functions
+            j (int)           : Index of the split
+            sequence (array)  : Full training dataset the plan was computed for
+            subset (str)      : "train", "cv" or "test"
+
+        Returns:
+            dataset (WindowDataset): Windows of the split subset
+
+        """
+
+        starts = {"train": plan.trainStarts, "cv": plan.cvStarts, "test": plan.testStarts}[subset]
+        if starts is None:
+            raise ValueError("The plan has no %s windows" % subset)
+
+        return cls(sequence, starts[j], plan.numInputs, plan.numOutputs, plan.dilation, plan.targetDilation)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            s = self.starts[index]
+            X = strided_windows(self.sequence, s, self.numInputs, 1, 1, self.dilation)[0]
+            y = strided_windows(self.sequence, s+self.numInputs*self.dilation, self.numOutputs, 1, 1, self.targetDilation)[0]
+            return X, y
+
+        starts = self.starts[index]
+        X = np.empty((len(starts), self.numInputs) + self.sequence.shape[1:], dtype=self.sequence.dtype)
+        y = np.empty((len(starts), self.numOutputs) + self.sequence.shape[1:], dtype=self.sequence.dtype)
+        return self.gather(starts, X, y)
+
+    def gather(self, starts, X, y):
+        """ Writes the windows beginning at the given starts into X and y, without intermediate copies
+
+        Parameters:
+            starts (array)  : Window starts, all taken from self.starts
+            X (array)       : Output of shape (len(starts), numInputs, *sequence.shape[1:])
+            y (array)       : Output of shape (len(starts), numOutputs, *sequence.shape[1:])
+
+        Returns:
+            X, y (arrays): The filled outputs
+
+        """
+
+        lenSequence = len(self.sequence)
+        inputSpan = self.numInputs*self.dilation
+        allX = strided_windows(self.sequence, 0, self.numInputs,
+                               window_count(lenSequence, window_span(self.numInputs, self.dilation), 1), 1, self.dilation)
+        allY = strided_windows(self.sequence, inputSpan, self.numOutputs,
+                               window_count(lenSequence, window_span(self.numOutputs, self.targetDilation), 1, inputSpan), 1,
+                               self.targetDilation)
+
+        # Starts were checked at construction, so clipping never changes them and lets take skip its buffering
+        np.take(allX, starts, axis=0, out=X, mode="clip")
+        np.take(allY, starts, axis=0, out=y, mode="clip")
+        return X, y
+
+
+class BatchSampler:
+    """ Iterates over shuffled mini-batches of a WindowDataset, one epoch per iteration
+
+        Batches are gathered by a background thread into prefetch+2 preallocated buffers that are reused
+        from batch to batch, so a yielded (X, y) batch is only valid until the next batch is requested.
+        Copy it (e.g. to the GPU) before moving on
+        i.e. for X, y in BatchSampler(dataset, batchSize=256, seed=0):
+                 model.train_on_batch(X, y)
+
+    Attributes:
+        dataset (WindowDataset)  : Windows to sample from
+        batchSize (int)          : Number of windows per batch
+        shuffle (bool)           : Whether windows are drawn in a new random order at each epoch
+        dropLast (bool)          : Whether the last, smaller batch of an epoch is skipped
+        prefetch (int)           : Number of batches gathered ahead of the consumer
+
+    """
+
+    def __init__(self, dataset, batchSize, shuffle=True, dropLast=False, prefetch=2, seed=None):
+        if (batchSize < 1 or prefetch < 1):
+            raise ValueError("batchSize and prefetch must be at least 1")
+
+        self.dataset = dataset
+        self.batchSize = batchSize
+        self.shuffle = shuffle
+        self.dropLast = dropLast
+        self.prefetch = prefetch
+        self._rng = np.random.default_rng(seed)
+
+        sequence = dataset.sequence
+        self._buffers = [(np.empty((batchSize, dataset.numInputs) + sequence.shape[1:], dtype=sequence.dtype),
+                          np.empty((batchSize, dataset.numOutputs) + sequence.shape[1:], dtype=sequence.dtype))
+                         for _ in range(prefetch+2)]
+
+    def __len__(self):
+        if self.dropLast:
+            return len(self.dataset)//self.batchSize
+        return -(-len(self.dataset)//self.batchSize)
+
+    def __iter__(self):
+        order = self._rng.permutation(len(self.dataset)) if self.shuffle else np.arange(len(self.dataset))
+        starts = self.dataset.starts[order]
+
+        # At most prefetch batches wait in the queue, one is held by the consumer and one is being filled,
+        # so the buffer being filled is never one the consumer may still read
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for b in range(len(self)):
+                    batch = starts[b*self.batchSize:(b+1)*self.batchSize]
+                    X, y = self._buffers[b % len(self._buffers)]
+                    item = self.dataset.gather(batch, X[:len(batch)], y[:len(batch)])
+                    while not stop.is_set():
+                        try:
+                            batches.put(item, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+                batches.put(None)
+            except BaseException as error:
+                batches.put(error)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            while worker.is_alive():
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    worker.join(0.1)
@@ -0,0 +1,109 @@
+"""
+Instrumentation of the splitters: per call timings, sizes and warnings, reported to the 'tsxv' logger and to hooks
+"""
+
+import logging
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from .windows import result_arrays
+
+logger = logging.getLogger("tsxv")
+logger.addHandler(logging.NullHandler())
+
+SplitReport = namedtuple("SplitReport", ["splitter", "indexTime", "materializeTime", "outputBytes", "numFolds",
+                                         "numWindows"])
+
+# Functions called with the SplitReport of every instrumented splitter call
+_hooks = list()
+
+
+class ShortSequenceWarning(UserWarning):
+    """ Warning raised when the sequence is too short for a splitter to produce any (X,y) set or split
+
+    Attributes:
+        splitter (str)     : Name of the splitter
+        lenSequence (int)  : Number of samples in the sequence
+        numInputs (int)    : Number of inputs requested (or minimum number of inputs)
+        numOutputs (int)   : Number of outputs requested
+        numJumps (int)     : Number of sequence samples between (X,y) sets
+
+    """
+
+    def __init__(self, message, splitter, lenSequence, numInputs, numOutputs, numJumps):
+        super().__init__(message)
+        self.splitter = splitter
+        self.lenSequence = lenSequence
+        self.numInputs = numInputs
+        self.numOutputs = numOutputs
+        self.numJumps = numJumps
+
+
+def warn_short(message, splitter, lenSequence, numInputs, numOutputs, numJumps, stacklevel=3):
+    """ Issues a ShortSequenceWarning from the caller of the splitter, stacklevel frames above warn_short """
+
+    warnings.warn(ShortSequenceWarning(message, splitter, lenSequence, numInputs, numOutputs, numJumps),
+                  stacklevel=stacklevel)
+
+
+def add_hook(hook):
+    """ Registers hook(report) to be called with the SplitReport of every splitter call
+
+    Parameters:
+        hook (function)  : Function taking a SplitReport, e.g. to feed a metrics dashboard
+
+    """
+
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """ Unregisters a hook added with add_hook """
+
+    _hooks.remove(hook)
+
+
+def count_windows(*sets):
+    """ Returns the number of windows over every split of the given sets,
+        each one a dictionary or a list holding the windows (or window starts) of each split
+    """
+
+    return sum(len(windows) for folds in sets for windows in (folds.values() if isinstance(folds, dict) else folds))
+
+
+def report_split(splitter, sequence, result, begin, indexed, numFolds, numWindows, source=None):
+    """ Reports a splitter call to the 'tsxv' logger (at DEBUG level) and to the registered hooks
+
+        Nothing is computed unless a hook is registered or DEBUG logging is enabled for 'tsxv'
+
+    Parameters:
+        splitter (str)     : Name of the splitter
+        sequence (array)   : Sequence the splitter took its windows from
+        result             : Output of the splitter
+        begin (float)      : time.perf_counter() when the call started
+        indexed (float)    : time.perf_counter() when the window starts (or counts) were computed
+        numFolds (int)     : Number of splits produced, None for the split_train functions
+        numWindows (int)   : Number of (X,y) windows produced over every split
+        source (array)     : Sequence given by the caller, when the splitter took its views over a cast copy of it
+
+    """
+
+    end = time.perf_counter()
+    if not (_hooks or logger.isEnabledFor(logging.DEBUG)):
+        return
+
+    # Views over the sequence are not allocated by the call
+    outputBytes = sum(array.nbytes for array in result_arrays(result) if not np.may_share_memory(array, sequence))
+    if (source is not None and not np.may_share_memory(source, sequence)):
+        # The cast copy the views are taken over is allocated by the call as well
+        outputBytes += sequence.nbytes
+    report = SplitReport(splitter, indexed-begin, end-indexed, outputBytes, numFolds, numWindows)
+
+    logger.debug("%s: %d folds, %d windows, %d bytes, index %.6fs, materialize %.6fs", splitter,
+                 -1 if numFolds is None else numFolds, numWindows, outputBytes, report.indexTime,
+                 report.materializeTime)
+    for hook in list(_hooks):
+        hook(report)
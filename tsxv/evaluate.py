@@ -0,0 +1,146 @@
+"""
+Parallel evaluation of a model on every train/val(/test) split, with the sequence shared between processes
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .splitTrainVal import split_train_val_forwardChaining
+from .splitTrainValTest import split_train_val_test_forwardChaining
+from .windows import as_sequence, gather_windows
+
+FoldResult = namedtuple("FoldResult", ["fold", "score", "buildTime", "fitTime"])
+WalkForwardResult = namedtuple("WalkForwardResult", ["fold", "score", "testScore", "numNew", "updateTime", "scoreTime"])
+
+# Sequence attached by each worker process to the shared memory block
+_shared = None
+
+
+def _attach(name, shape, dtype):
+    global _shared
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(name=name)
+    _shared = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _run_fold(j, starts, numInputs, numOutputs, fitScore, dilation=1, targetDilation=1):
+    sequence = _shared[1]
+
+    begin = time.perf_counter()
+    windows = list()
+    for s in starts:
+        windows.append(gather_windows(sequence, s, numInputs, dilation=dilation))
+        windows.append(gather_windows(sequence, np.asarray(s, dtype=np.intp)+numInputs*dilation, numOutputs,
+                                      dilation=targetDilation))
+    built = time.perf_counter()
+
+    score = fitScore(*windows)
+    return FoldResult(j, score, built-begin, time.perf_counter()-built)
+
+
+def evaluate_folds(splitter, sequence, numInputs, numOutputs, numJumps, fitScore, maxWorkers=None, **kwargs):
+    """ Fits and scores a model on every split of a splitter, one split per task on a pool of processes
+
+        The sequence is copied once into shared memory, and each worker rebuilds its split windows
+        from the window starts, so only a few integer arrays are sent to the workers
+
+    Parameters:
+        splitter (function)  : One of the plan_* functions, e.g. plan_train_val_kFold
+        sequence (array)     : Full training dataset, or path to a .npy file
+        numInputs (int)      : Number of inputs X and Xcv used at each training
+        numOutputs (int)     : Number of outputs y and ycv used at each training
+        numJumps (int)       : Number of sequence samples to be ignored between (X,y) sets
+        fitScore (function)  : Picklable function fitScore(X, y, Xcv, ycv[, Xtest, ytest]) returning the split score
+        maxWorkers (int)     : Number of processes, defaults to the number of CPUs
+        **kwargs             : Extra arguments of the splitter, e.g. numGroups or dilation
+
+    Returns:
+        results (list): FoldResult(fold, score, buildTime, fitTime) of each split, in split order
+
+    """
+
+    from multiprocessing.shared_memory import SharedMemory
+
+    sequence = as_sequence(sequence)
+    plan = splitter(sequence, numInputs, numOutputs, numJumps, **kwargs)
+
+    shm = SharedMemory(create=True, size=max(1, sequence.nbytes))
+    try:
+        np.ndarray(sequence.shape, dtype=sequence.dtype, buffer=shm.buf)[...] = sequence
+
+        with ProcessPoolExecutor(max_workers=maxWorkers, initializer=_attach,
+                                 initargs=(shm.name, sequence.shape, sequence.dtype)) as pool:
+            futures = list()
+            for j in range(len(plan)):
+                starts = [plan.trainStarts[j], plan.cvStarts[j]]
+                if plan.testStarts is not None:
+                    starts.append(plan.testStarts[j])
+                futures.append(pool.submit(_run_fold, j, starts, numInputs, numOutputs, fitScore,
+                                           plan.dilation, plan.targetDilation))
+
+            return [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def walk_forward(model, sequence, numInputs, numOutputs, numJumps, score=None, withTest=False, refitEvery=None, dtype=None,
+                 dilation=1, targetDilation=1):
+    """ Backtests a model over the forward chaining splits, updating it only with the windows each split adds
+
+        The training windows of split j are those of split j-1 plus one more, so instead of refitting on
+        every split the model is warm-started: model.partial_fit(Xnew, ynew) receives only the new windows
+        (both windows of the first split), and model.fit(X, y) on every training window is only called
+        every refitEvery splits. Windows are read-only views over the sequence
+
+    Parameters:
+        model                : Object with partial_fit(X, y) (unless refitEvery is 1), and fit(X, y) when refitEvery is given
+        sequence (array)     : Full training dataset, or path to a .npy file
+        numInputs (int)      : Number of inputs X and Xcv used at each training
+        numOutputs (int)     : Number of outputs y and ycv used at each training
+        numJumps (int)       : Number of sequence samples to be ignored between (X,y) sets
+        score (function)     : score(model, Xcv, ycv) returning the split score, defaults to model.score(Xcv, ycv)
+        withTest (bool)      : Whether the splits hold a test window, scored as well
+        refitEvery (int)     : Refit from scratch every refitEvery splits (1 refits on every split), None never refits
+        dtype (dtype)        : Type of the windows, e.g. np.float32
+        dilation (int)       : Number of sequence samples between consecutive inputs
+        targetDilation (int) : Number of sequence samples between consecutive outputs
+
+    Returns:
+        results (list): WalkForwardResult(fold, score, testScore, numNew, updateTime, scoreTime) of each split,
+                        testScore is None without a test set
+
+    """
+
+    if (refitEvery != 1 and not hasattr(model, "partial_fit")):
+        raise TypeError("%s has no partial_fit, pass refitEvery=1 to refit it on every split" % type(model).__name__)
+    if score is None:
+        score = lambda fitted, X, y: fitted.score(X, y)
+
+    splitter = split_train_val_test_forwardChaining if withTest else split_train_val_forwardChaining
+    sets = splitter(sequence, numInputs, numOutputs, numJumps, asViews=True, dtype=dtype,
+                    dilation=dilation, targetDilation=targetDilation)
+
+    results = list()
+    numSeen = 0
+    for j in range(len(sets[0])):
+        X, y = sets[0][j], sets[1][j]
+
+        begin = time.perf_counter()
+        if (refitEvery and j % refitEvery == 0):
+            model.fit(X, y)
+        else:
+            model.partial_fit(X[numSeen:], y[numSeen:])
+        updated = time.perf_counter()
+
+        cvScore = score(model, sets[2][j], sets[3][j])
+        testScore = score(model, sets[4][j], sets[5][j]) if withTest else None
+        results.append(WalkForwardResult(j, cvScore, testScore, len(X)-numSeen, updated-begin,
+                                         time.perf_counter()-updated))
+        numSeen = len(X)
+
+    return results
@@ -0,0 +1,118 @@
+"""
+Incremental splitting of a live series: appending new samples only builds the windows and splits they create
+"""
+
+import numpy as np
+
+from .splitTrainVal import plan_train_val_forwardChaining
+from .splitTrainValTest import plan_train_val_test_forwardChaining
+from .windows import as_sequence, window_count, strided_windows
+
+
+class LiveSplitter:
+    """ Holds a growing sequence in a buffer that doubles in place, and returns the new (X, y) sets of
+        split_train, or the new splits of split_train_val(_test)_forwardChaining, each time samples are appended
+
+        Returned windows are read-only views over the buffer. Samples are never modified once appended,
+        so views taken before the buffer grows stay valid. The buffer is upcast (e.g. from int to float)
+        when appended samples do not fit its type. The first call (e.g. with no samples) also
+        returns the sets or splits already held by the initial sequence
+
+    Attributes:
+        numInputs (int)   : Number of inputs X used at each training
+        numOutputs (int)  : Number of outputs y used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        withTest (bool)   : Whether the forward chaining splits hold a test set
+
+    """
+
+    def __init__(self, sequence, numInputs, numOutputs, numJumps, withTest=False):
+        sequence = as_sequence(sequence)
+        self.numInputs = numInputs
+        self.numOutputs = numOutputs
+        self.numJumps = numJumps
+        self.withTest = withTest
+
+        self._buffer = np.array(sequence, copy=True)
+        self._length = len(sequence)
+        self._numSets = 0
+        self._numFolds = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def sequence(self):
+        """ Read-only view of the samples appended so far """
+        view = self._buffer[:self._length]
+        view.flags.writeable = False
+        return view
+
+    def _extend(self, newValues):
+        newValues = as_sequence(newValues)
+        end = self._length + len(newValues)
+        dtype = np.result_type(self._buffer.dtype, newValues.dtype) if len(newValues) else self._buffer.dtype
+
+        # Double the capacity when full, so appending costs amortized O(len(newValues))
+        if (end > len(self._buffer) or dtype != self._buffer.dtype):
+            capacity = max(end, 2*len(self._buffer)) if end > len(self._buffer) else len(self._buffer)
+            grown = np.empty((capacity,) + self._buffer.shape[1:], dtype=dtype)
+            grown[:self._length] = self._buffer[:self._length]
+            self._buffer = grown
+
+        self._buffer[self._length:end] = newValues
+        self._length = end
+
+    def append(self, newValues=()):
+        """ Appends samples and returns the (X,y) sets of split_train they complete
+
+        Parameters:
+            newValues (array)  : Samples to append to the sequence
+
+        Returns:
+            X (2D array): Read-only view of the new numInputs arrays
+            y (2D array): Read-only view of the new numOutputs arrays
+
+        """
+
+        self._extend(newValues)
+
+        numSets = window_count(self._length, self.numInputs+self.numOutputs, self.numJumps)
+        first, self._numSets = self._numSets, numSets
+
+        sequence = self.sequence
+        X = strided_windows(sequence, first*self.numJumps, self.numInputs, numSets-first, self.numJumps)
+        y = strided_windows(sequence, first*self.numJumps+self.numInputs, self.numOutputs, numSets-first, self.numJumps)
+
+        return X, y
+
+    def append_forwardChaining(self, newValues=()):
+        """ Appends samples and returns the forward chaining splits they complete
+
+        Parameters:
+            newValues (array)  : Samples to append to the sequence
+
+        Returns:
+            X, y, Xcv, ycv (dict)  : Read-only views of the training and cross-validation windows of each new split,
+                                     keyed by split index as in split_train_val_forwardChaining
+            Xtest, ytest (dict)    : Test windows of each new split, only if withTest
+
+        """
+
+        self._extend(newValues)
+
+        planner = plan_train_val_test_forwardChaining if self.withTest else plan_train_val_forwardChaining
+        plan = planner(self._length, self.numInputs, self.numOutputs, self.numJumps)
+        first, self._numFolds = self._numFolds, len(plan)
+
+        sequence = self.sequence
+        folds = [plan.trainStarts, plan.cvStarts] + ([] if plan.testStarts is None else [plan.testStarts])
+        sets = tuple(dict() for _ in range(2*len(folds)))
+        for j in range(first, len(plan)):
+            # The starts of each set are numJumps apart, so its windows are a single strided view
+            for k, starts in enumerate(folds):
+                start, numWindows = int(starts[j][0]), len(starts[j])
+                sets[2*k][j] = strided_windows(sequence, start, self.numInputs, numWindows, self.numJumps)
+                sets[2*k+1][j] = strided_windows(sequence, start+self.numInputs, self.numOutputs, numWindows, self.numJumps)
+
+        return sets
@@ -0,0 +1,154 @@
+"""
+scikit-learn compatible cross-validators yielding index arrays for Forward Chaining, K-Fold and Group K-Fold
+
+The samples being split are the windows of split_train(sequence, numInputs, numOutputs, 1), i.e. sample s is the
+(X, y) window starting at sequence[s]. The indices follow the windowing of the matching tsxv splitter, so e.g.
+    X, y = split_train(sequence, numInputs, numOutputs, 1)
+    cross_validate(model, X, y, cv=KFold(numInputs, numOutputs, numJumps), n_jobs=-1)
+only ships the small index arrays to each worker
+"""
+
+from .splitTrainVal import plan_train_val_forwardChaining, plan_train_val_kFold, plan_train_val_groupKFold
+from .splitTrainValTest import plan_train_val_test_forwardChaining, plan_train_val_test_kFold, plan_train_val_test_groupKFold
+
+
+class _WindowSplitter:
+    """ Base class of the cross-validators, wrapping the plan_* function set as _planner by each subclass,
+        called with the attributes named in _plannerArgs as extra keyword arguments
+    """
+
+    _planner = None
+    _plannerArgs = ()
+
+    def __init__(self, numInputs, numOutputs, numJumps):
+        self.numInputs = numInputs
+        self.numOutputs = numOutputs
+        self.numJumps = numJumps
+
+    def __repr__(self):
+        params = ", ".join("%s=%r" % item for item in vars(self).items())
+        return "%s(%s)" % (type(self).__name__, params)
+
+    def plan(self, X):
+        """ Returns the SplitPlan of the windows in X
+
+        Parameters:
+            X (array)  : Windows to split, one per sequence sample they start at
+
+        Returns:
+            plan (SplitPlan): Window starts of each split, which are also row indices of X
+
+        """
+
+        # X holds every window with numJumps=1, so the sequence it was built from is this long
+        lenSequence = len(X) + self.numInputs + self.numOutputs - 1 if len(X) > 0 else 0
+        kwargs = {name: getattr(self, name) for name in self._plannerArgs}
+        return self._planner(lenSequence, self.numInputs, self.numOutputs, self.numJumps, **kwargs)
+
+    def split(self, X, y=None, groups=None):
+        """ Yields the indices of the training and cross-validation windows of each split
+
+        Parameters:
+            X (array)  : Windows to split, one per sequence sample they start at
+            y (array)  : Ignored, exists for compatibility
+            groups     : Ignored, exists for compatibility
+
+        Yields:
+            train (array) : Row indices of X used for training
+            cv (array)    : Row indices of X used for cross-validation
+
+        """
+
+        plan = self.plan(X)
+        for j in range(len(plan)):
+            yield plan.trainStarts[j], plan.cvStarts[j]
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        """ Returns the number of splits made on X
+
+        Parameters:
+            X (array)  : Windows to split, one per sequence sample they start at
+            y (array)  : Ignored, exists for compatibility
+            groups     : Ignored, exists for compatibility
+
+        Returns:
+            numSplits (int): Number of train/val splits
+
+        """
+
+        if X is None:
+            raise ValueError("The number of splits depends on the length of X, which must be provided")
+
+        return len(self.plan(X))
+
+
+class _WindowSplitterWithTest(_WindowSplitter):
+    """ Base class of the cross-validators that also hold out a test set at each split
+
+        split() yields (train, cv) pairs as expected by scikit-learn, the test windows are left out of both
+    """
+
+    def split_with_test(self, X, y=None, groups=None):
+        """ Yields the indices of the training, cross-validation and test windows of each split
+
+        Parameters:
+            X (array)  : Windows to split, one per sequence sample they start at
+            y (array)  : Ignored, exists for compatibility
+            groups     : Ignored, exists for compatibility
+
+        Yields:
+            train (array) : Row indices of X used for training
+            cv (array)    : Row indices of X used for cross-validation
+            test (array)  : Row indices of X used for testing
+
+        """
+
+        plan = self.plan(X)
+        for j in range(len(plan)):
+            yield plan.trainStarts[j], plan.cvStarts[j], plan.testStarts[j]
+
+
+class ForwardChaining(_WindowSplitter):
+    """ Forward Chaining cross-validator, see split_train_val_forwardChaining """
+
+    _planner = staticmethod(plan_train_val_forwardChaining)
+
+
+class KFold(_WindowSplitter):
+    """ K-Fold cross-validator, see split_train_val_kFold """
+
+    _planner = staticmethod(plan_train_val_kFold)
+
+
+class GroupKFold(_WindowSplitter):
+    """ Group K-Fold cross-validator, see split_train_val_groupKFold """
+
+    _planner = staticmethod(plan_train_val_groupKFold)
+    _plannerArgs = ("numGroups",)
+
+    def __init__(self, numInputs, numOutputs, numJumps, numGroups=5):
+        super().__init__(numInputs, numOutputs, numJumps)
+        self.numGroups = numGroups
+
+
+class ForwardChainingWithTest(_WindowSplitterWithTest):
+    """ Forward Chaining cross-validator with a test set, see split_train_val_test_forwardChaining """
+
+    _planner = staticmethod(plan_train_val_test_forwardChaining)
+
+
+class KFoldWithTest(_WindowSplitterWithTest):
+    """ K-Fold cross-validator with a test set, see split_train_val_test_kFold """
+
+    _planner = staticmethod(plan_train_val_test_kFold)
+
+
+class GroupKFoldWithTest(_WindowSplitterWithTest):
+    """ Group K-Fold cross-validator with a test set, see split_train_val_test_groupKFold """
+
+    _planner = staticmethod(plan_train_val_test_groupKFold)
+    _plannerArgs = ("numGroups",)
+
+    def __init__(self, numInputs, numOutputs, numJumps, numGroups=5):
+        super().__init__(numInputs, numOutputs, numJumps)
+        self.numGroups = numGroups
@@ -0,0 +1,260 @@
+"""
+Opt-in memoization of the splitters, keyed on a fingerprint of the sequence content and the split parameters
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from .windows import as_sequence, load_sequence, result_arrays
+
+# Bytes hashed at once when fingerprinting a sequence
+_HASH_CHUNK = 16*2**20
+
+# Number of evenly spaced samples hashed by the opt-in sampled fingerprint
+_SAMPLE_ROWS = 2**12
+
+
+def fingerprint(sequence, sampled=False):
+    """ Returns a content fingerprint of the sequence: a BLAKE2b digest of its dtype, shape and samples
+
+        Every sample is hashed, at about memory bandwidth. With sampled=True only _SAMPLE_ROWS evenly
+        spaced samples are hashed, in constant time. This is unsafe: sequences that differ only between
+        the sampled positions get the same fingerprint, so a cache keyed on it can return splits of other data
+
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+        sampled (bool)    : If True, hash a fixed sample of the sequence instead of every sample
+
+    Returns:
+        fingerprint (str): Hexadecimal digest, equal for sequences with equal content
+
+    """
+
+    sequence = as_sequence(sequence)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(("%s%s%s" % (sequence.dtype.str, sequence.shape, "sampled" if sampled else "full")).encode())
+
+    if (sampled and sequence.ndim > 0 and len(sequence) > _SAMPLE_ROWS):
+        rows = np.unique(np.linspace(0, len(sequence)-1, _SAMPLE_ROWS).astype(np.intp))
+        digest.update(np.ascontiguousarray(sequence[rows]).view(np.uint8))
+        return digest.hexdigest()
+
+    flat = sequence.reshape(-1) if sequence.flags.c_contiguous else np.ravel(sequence)
+    step = max(1, _HASH_CHUNK//max(1, sequence.itemsize))
+    for i in range(0, len(flat), step):
+        digest.update(np.ascontiguousarray(flat[i:i+step]).view(np.uint8))
+
+    return digest.hexdigest()
+
+
+def _read_only(value):
+    for array in result_arrays(value):
+        array.flags.writeable = False
+    return value
+
+
+class SplitCache:
+    """ LRU cache of splitter results, bounded in bytes, optionally spilled to .npy files that survive restarts
+
+        Cached arrays are made read-only, so callers cannot corrupt the cached entries.
+        Views over the sequence take no room of maxBytes and are stored on disk as their offset, shape
+        and strides, rebuilt over the sequence of the call that loads them
+        i.e. cache = SplitCache(maxBytes=2**30, directory="split-cache")
+             X, y, Xcv, ycv = cache(split_train_val_kFold, sequence, numInputs, numOutputs, numJumps)
+
+    Attributes:
+        maxBytes (int)    : Maximum bytes of the arrays held in memory
+        directory (str)   : Directory of the on-disk store, None to keep the cache in memory only
+        sampledKey (bool) : If True, key the calls on the sampled fingerprint of the sequence instead of its
+                            full content hash. Unsafe: a call on different data can hit (see fingerprint)
+        hits (int)        : Number of calls answered from the cache
+        misses (int)      : Number of calls that ran the splitter
+
+    """
+
+    def __init__(self, maxBytes=2**30, directory=None, sampledKey=False):
+        self.maxBytes = maxBytes
+        self.directory = directory
+        self.sampledKey = sampledKey
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, splitter, sequence, *args, **kwargs):
+        """ Returns the cache key of a splitter call """
+
+        params = json.dumps([splitter.__module__, splitter.__qualname__, args, sorted(kwargs.items())], default=str)
+        return hashlib.blake2b((fingerprint(sequence, self.sampledKey) + params).encode(), digest_size=16).hexdigest()
+
+    def __call__(self, splitter, sequence, *args, **kwargs):
+        """ Returns splitter(sequence, *args, **kwargs), from the cache when the same call was made before
+
+        Parameters:
+            splitter (function)  : One of the split_* or plan_* functions
+            sequence (array)     : Full training dataset, or path to a .npy file
+            *args, **kwargs      : Other arguments of the splitter
+
+        Returns:
+            result: Output of the splitter, with read-only arrays
+
+        """
+
+        sequence = load_sequence(sequence)
+        key = self.key(splitter, sequence, *args, **kwargs)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        result = self._load(key, sequence)
+        if result is None:
+            self.misses += 1
+            result = _read_only(splitter(sequence, *args, **kwargs))
+            self._save(key, result, sequence)
+        else:
+            self.hits += 1
+
+        self._insert(key, result, sequence)
+        return result
+
+    def wrap(self, splitter):
+        """ Returns a cached version of the splitter, with the same arguments """
+
+        def cached(sequence, *args, **kwargs):
+            return self(splitter, sequence, *args, **kwargs)
+
+        cached.__name__ = splitter.__name__
+        cached.__doc__ = splitter.__doc__
+        return cached
+
+    def clear(self):
+        """ Empties the in-memory cache, the on-disk store is kept """
+
+        self._entries.clear()
+        self._bytes = 0
+
+    def _insert(self, key, result, sequence):
+        # Views over the sequence hold no memory of their own
+        size = sum(array.nbytes for array in result_arrays(result) if not np.may_share_memory(array, sequence))
+        if size > self.maxBytes:
+            return
+
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.maxBytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def _save(self, key, result, sequence):
+        if self.directory is None:
+            return
+
+        arrays = list()
+        try:
+            layout = _encode(result, arrays, _view_base(sequence))
+        except TypeError:
+            # Results that are not made of arrays, dicts, lists and tuples are kept in memory only
+            return
+
+        entry = os.path.join(self.directory, key)
+        os.makedirs(entry, exist_ok=True)
+        for i, array in enumerate(arrays):
+            np.save(os.path.join(entry, "%d.npy" % i), array)
+        with open(os.path.join(entry, "layout.json"), "w") as f:
+            json.dump(layout, f)
+
+    def _load(self, key, sequence):
+        if self.directory is None:
+            return None
+
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, "layout.json")) as f:
+                layout = json.load(f)
+        except OSError:
+            return None
+
+        base = _view_base(sequence)
+        if (base is None and _has_views(layout)):
+            # Views can only be rebuilt over a contiguous sequence, run the splitter again
+            return None
+
+        return _decode(layout, lambda i: np.load(os.path.join(entry, "%d.npy" % i), mmap_mode="r"), base)
+
+
+def _view_base(sequence):
+    """ Returns the sequence as a flat array when views over it can be stored as offset, shape and strides """
+
+    sequence = as_sequence(sequence)
+    if not sequence.flags.c_contiguous:
+        return None
+
+    return sequence.reshape(-1)
+
+
+def _view_offset(array, base):
+    """ Returns the offset, in samples of base, of the first element of a view over base, None for other arrays """
+
+    if (base is None or array.dtype != base.dtype or not np.may_share_memory(array, base)):
+        return None
+
+    offset = array.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+    if (offset < 0 or offset % base.itemsize != 0):
+        return None
+
+    return offset//base.itemsize
+
+
+def _has_views(layout):
+    if "view" in layout:
+        return True
+    if "array" in layout:
+        return False
+    if "dict" in layout:
+        return any(_has_views(item) for _, item in layout["dict"])
+    return any(_has_views(item) for item in layout.get("list", layout.get("tuple", [])))
+
+
+def _encode(value, arrays, base=None):
+    if isinstance(value, np.ndarray):
+        offset = _view_offset(value, base)
+        if offset is not None:
+            return {"view": [offset, list(value.shape), list(value.strides)]}
+        arrays.append(value)
+        return {"array": len(arrays)-1}
+    if isinstance(value, dict):
+        return {"dict": [[_key(key), _encode(item, arrays, base)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return {type(value).__name__: [_encode(item, arrays, base) for item in value]}
+    raise TypeError("Cannot store %s on disk" % type(value).__name__)
+
+
+def _key(key):
+    if isinstance(key, (np.integer, int)):
+        return int(key)
+    if isinstance(key, str):
+        return key
+    raise TypeError("Cannot store a dict key of type %s on disk" % type(key).__name__)
+
+
+def _decode(layout, load, base=None):
+    if "view" in layout:
+        offset, shape, strides = layout["view"]
+        return as_strided(base[offset:], shape=tuple(shape), strides=tuple(strides), writeable=False)
+    if "array" in layout:
+        return load(layout["array"])
+    if "dict" in layout:
+        return {key: _decode(item, load, base) for key, item in layout["dict"]}
+    if "list" in layout:
+        return [_decode(item, load, base) for item in layout["list"]]
+    return tuple(_decode(item, load, base) for item in layout["tuple"])
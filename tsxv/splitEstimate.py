@@ -0,0 +1,157 @@
+"""
+Closed form estimate of the number of splits, windows and bytes a splitter produces, computed before any allocation
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .splitPlan import interleaved_end, interleaved_start
+from .splitTrainVal import plan_train_val_groupKFold
+from .splitTrainValTest import plan_train_val_test_groupKFold
+from .windows import index_dtype, load_sequence, sequence_length, window_count
+
+SplitEstimate = namedtuple("SplitEstimate", ["numFolds", "trainWindows", "cvWindows", "testWindows", "outputBytes"])
+
+
+def estimate_split(splitter, sequence, numInputs, numOutputs, numJumps, memoryBudget=None, itemsize=None, **kwargs):
+    """ Returns the number of splits and of windows per split of a splitter, and the bytes of its output,
+        from the sequence length alone
+
+    Parameters:
+        splitter (function)  : One of the split_train_val_*, split_train_val_test_* (or plan_*, iter_*) functions
+        sequence (array)     : Full training dataset (or its length), or path to a .npy file
+        numInputs (int)      : Number of inputs X and Xcv used at each training
+        numOutputs (int)     : Number of outputs y and ycv used at each training
+        numJumps (int)       : Number of sequence samples to be ignored between (X,y) sets
+        memoryBudget (int)   : If given, raise MemoryError when the output would take more bytes than this
+        itemsize (int)       : Bytes per sequence sample, taken from the sequence dtype and features (8 for a length)
+        **kwargs             : Extra arguments of the splitter, e.g. numGroups, dtype, dilation or targetDilation.
+                               With dtype, the windows take np.dtype(dtype).itemsize bytes per value.
+                               With asViews, only the cast copy of the sequence (if any) is counted, and with
+                               asShared, the distinct windows and the per-split indices into them
+
+    Returns:
+        estimate (SplitEstimate): numFolds, trainWindows, cvWindows and testWindows (windows per split,
+                                  None for testWindows without a test set) and outputBytes of every X, y, Xcv, ...
+
+    """
+
+    lenSequence = sequence_length(sequence)
+    dtype = kwargs.pop("dtype", None)
+    asViews = kwargs.pop("asViews", False)
+    asShared = kwargs.pop("asShared", False)
+
+    # Lengths are taken as float64 sequences
+    sequenceDtype = np.dtype(np.float64)
+    if not isinstance(sequence, (int, np.integer)):
+        sequence = np.asarray(load_sequence(sequence))
+        sequenceDtype = sequence.dtype
+    if itemsize is None:
+        numValues = 1 if isinstance(sequence, (int, np.integer)) else int(np.prod(sequence.shape[1:]))
+        itemsize = (sequenceDtype if dtype is None else np.dtype(dtype)).itemsize*numValues
+
+    technique = splitter.__name__.split("_")[-1]
+    withTest = "_test_" in splitter.__name__
+    estimators = {"forwardChaining": _forwardChaining, "kFold": _kFold, "groupKFold": _groupKFold}
+    if technique not in estimators:
+        raise ValueError("No estimate available for %s" % splitter.__name__)
+    if (asViews and technique != "forwardChaining"):
+        raise ValueError("%s has no asViews option" % splitter.__name__)
+    if (asShared and technique == "forwardChaining"):
+        raise ValueError("%s has no asShared option" % splitter.__name__)
+
+    # Dilated windows span numInputs*dilation and numOutputs*targetDilation samples of the sequence
+    inputSpan = numInputs*kwargs.pop("dilation", 1)
+    outputSpan = numOutputs*kwargs.pop("targetDilation", 1)
+    trainWindows, cvWindows, testWindows = estimators[technique](lenSequence, inputSpan, outputSpan, numJumps,
+                                                                 withTest, **kwargs)
+    numWindows = trainWindows.sum() + cvWindows.sum() + (0 if testWindows is None else testWindows.sum())
+    outputBytes = int(numWindows)*(numInputs+numOutputs)*itemsize
+
+    if asViews:
+        # The folds are views over the sequence, copied once only when dtype casts it
+        castsSequence = dtype is not None and np.dtype(dtype) != sequenceDtype
+        outputBytes = lenSequence*itemsize if castsSequence else 0
+    elif asShared:
+        # Every distinct window is stored once, each split holds indices into them
+        distinct = {"kFold": _kFoldDistinct, "groupKFold": _groupKFoldDistinct}[technique]
+        numDistinct = distinct(lenSequence, inputSpan, outputSpan, numJumps, withTest, **kwargs)
+        outputBytes = numDistinct*(numInputs+numOutputs)*itemsize + int(numWindows)*index_dtype(numDistinct).itemsize
+
+    if (memoryBudget is not None and outputBytes > memoryBudget):
+        raise MemoryError("%s would allocate %d bytes, above the memory budget of %d bytes"
+                          % (splitter.__name__, outputBytes, memoryBudget))
+
+    return SplitEstimate(len(trainWindows), trainWindows, cvWindows, testWindows, outputBytes)
+
+
+def _forwardChaining(lenSequence, numInputs, numOutputs, numJumps, withTest):
+    numHeldOut = 2 if withTest else 1
+    numFolds = max(0, (lenSequence-(numHeldOut+1)*numInputs-numOutputs)//numJumps)
+
+    trainWindows = np.arange(numFolds) + 2
+    cvWindows = np.ones(numFolds, dtype=int)
+    return trainWindows, cvWindows, cvWindows if withTest else None
+
+
+def _kFold(lenSequence, numInputs, numOutputs, numJumps, withTest):
+    numHeldOut = 2 if withTest else 1
+    numFolds = max(0, (lenSequence-(numHeldOut+1)*numInputs-numOutputs)//numJumps)
+
+    # Training windows before the held out windows, then after them until the end of the sequence
+    folds = np.arange(numFolds)
+    room = lenSequence - (numJumps*(folds+1) + (numHeldOut+1)*numInputs) - (numInputs+numOutputs)
+    trainWindows = folds + 2 + np.where(room >= 0, room//numJumps + 1, 0)
+    cvWindows = np.ones(numFolds, dtype=int)
+    return trainWindows, cvWindows, cvWindows if withTest else None
+
+
+def _groupKFold(lenSequence, numInputs, numOutputs, numJumps, withTest, numGroups=5):
+    if (numGroups < (3 if withTest else 2)):
+        raise ValueError("Group K-Fold needs at least %d groups" % (3 if withTest else 2))
+
+    trainWindows, cvWindows, testWindows = list(), list(), list()
+    for j in range(numGroups):
+        cvOffset = (numGroups-1-j) % numGroups
+        period = numGroups-1 if withTest else numGroups
+        numCv = lambda last: max(0, (last-cvOffset)//period + 1)
+
+        if withTest:
+            layout = (period, cvOffset, numJumps, numInputs, 2*numInputs)
+            end = interleaved_end(*layout, lenSequence-numInputs-numOutputs, lenSequence-2*numInputs-numOutputs)
+            numTest = numCv(end-1)
+            endIsCv = end >= cvOffset and (end-cvOffset) % period == 0
+            cvOnly = endIsCv and interleaved_start(end, *layout) <= lenSequence-numInputs-numOutputs
+            trainWindows.append(end-numTest)
+            cvWindows.append(numTest + int(cvOnly))
+            testWindows.append(numTest)
+        else:
+            layout = (period, cvOffset, numJumps, numInputs, numInputs)
+            end = interleaved_end(*layout, lenSequence-1-numInputs-numOutputs, lenSequence-numInputs-numOutputs)
+            trainWindows.append(end-numCv(end-1))
+            cvWindows.append(numCv(end-1))
+
+    return np.array(trainWindows), np.array(cvWindows), np.array(testWindows) if withTest else None
+
+
+def _kFoldDistinct(lenSequence, numInputs, numOutputs, numJumps, withTest):
+    numHeldOut = 2 if withTest else 1
+    numFolds = max(0, (lenSequence-(numHeldOut+1)*numInputs-numOutputs)//numJumps)
+    if (numFolds == 0):
+        return 0
+
+    # Training windows before the held out windows of every split, the held out windows,
+    # and the training windows after them, all on one grid that starts after the first split's held out windows
+    before = numJumps*np.arange(numFolds+1)
+    heldOut = [numJumps*np.arange(1, numFolds+1) + k*numInputs for k in range(1, numHeldOut+1)]
+    first = numJumps + (numHeldOut+1)*numInputs
+    after = first + numJumps*np.arange(window_count(lenSequence, numInputs+numOutputs, numJumps, first))
+    return len(np.unique(np.concatenate([before, after] + heldOut)))
+
+
+def _groupKFoldDistinct(lenSequence, numInputs, numOutputs, numJumps, withTest, numGroups=5):
+    planner = plan_train_val_test_groupKFold if withTest else plan_train_val_groupKFold
+    plan = planner(lenSequence, numInputs, numOutputs, numJumps, numGroups)
+    sets = plan.trainStarts + plan.cvStarts + (plan.testStarts or [])
+    return len(np.unique(np.concatenate(sets))) if sets else 0
@@ -0,0 +1,330 @@
+"""
+Index-only representation of train/val(/test) splits: window start offsets per fold, materialized on demand
+"""
+
+import os
+
+import numpy as np
+
+from .windows import as_sequence, gather_windows, index_dtype
+
+
+class SplitPlan:
+    """ Window start offsets of every fold produced by a splitter
+        i.e. X = sequence[s], sequence[s+dilation], ..., sequence[s+(numInputs-1)*dilation]
+             y = sequence[s+numInputs*dilation], ..., sequence[s+numInputs*dilation+(numOutputs-1)*targetDilation]
+             for every start s of the fold's train, cv or test windows
+
+    Attributes:
+        numInputs (int)       : Number of inputs X, Xcv and Xtest of each window
+        numOutputs (int)      : Number of outputs y, ycv and ytest of each window
+        trainStarts (list)    : Integer array of training window starts, one per fold
+        cvStarts (list)       : Integer array of cross-validation window starts, one per fold
+        testStarts (list)     : Integer array of test window starts, one per fold (None for train/val splits)
+        dilation (int)        : Number of sequence samples between consecutive inputs
+        targetDilation (int)  : Number of sequence samples between consecutive outputs
+
+    """
+
+    def __init__(self, numInputs, numOutputs, trainStarts, cvStarts, testStarts=None, dilation=1, targetDilation=1):
+        self.numInputs = numInputs
+        self.numOutputs = numOutputs
+        self.trainStarts = trainStarts
+        self.cvStarts = cvStarts
+        self.testStarts = testStarts
+        self.dilation = dilation
+        self.targetDilation = targetDilation
+
+    def __len__(self):
+        return len(self.trainStarts)
+
+    def __repr__(self):
+        return "SplitPlan(numFolds=%d, numInputs=%d, numOutputs=%d, test=%s)" % (
+            len(self), self.numInputs, self.numOutputs, self.testStarts is not None)
+
+    def _windows(self, sequence, starts, dtype=None):
+        X = gather_windows(sequence, starts, self.numInputs, dtype=dtype, dilation=self.dilation)
+        y = gather_windows(sequence, np.asarray(starts, dtype=np.intp)+self.numInputs*self.dilation, self.numOutputs,
+                           dtype=dtype, dilation=self.targetDilation)
+        return X, y
+
+    def fold(self, j, sequence, dtype=None):
+        """ Returns the windows of a single train/val(/test) split
+
+        Parameters:
+            j (int)           : Index of the split
+            sequence (array)  : Full training dataset the plan was computed for
+            dtype (dtype)     : Type of the windows, cast while they are gathered. None keeps the sequence dtype
+
+        Returns:
+            X, y, Xcv, ycv (2D arrays)  : Training and cross-validation windows
+            Xtest, ytest (2D arrays)    : Test windows, only if the plan has a test set
+
+        """
+
+        X, y = self._windows(sequence, self.trainStarts[j], dtype)
+        Xcv, ycv = self._windows(sequence, self.cvStarts[j], dtype)
+        if self.testStarts is None:
+            return X, y, Xcv, ycv
+
+        Xtest, ytest = self._windows(sequence, self.testStarts[j], dtype)
+        return X, y, Xcv, ycv, Xtest, ytest
+
+    def save_fold(self, j, sequence, directory, dtype=None):
+        """ Writes the windows of a single train/val(/test) split to .npy files, chunk by chunk,
+            so that neither the sequence nor the split needs to fit in RAM
+
+        Parameters:
+            j (int)           : Index of the split
+            sequence (array)  : Full training dataset the plan was computed for, or path to a .npy file
+            directory (str)   : Directory where X.npy, y.npy, Xcv.npy, ... are written
+            dtype (dtype)     : Type of the stored windows. None keeps the sequence dtype
+
+        Returns:
+            X, y, Xcv, ycv (np.memmap)  : Training and cross-validation windows
+            Xtest, ytest (np.memmap)    : Test windows, only if the plan has a test set
+
+        """
+
+        sequence = as_sequence(sequence)
+        os.makedirs(directory, exist_ok=True)
+
+        sets = [("X", "y", self.trainStarts[j]), ("Xcv", "ycv", self.cvStarts[j])]
+        if self.testStarts is not None:
+            sets.append(("Xtest", "ytest", self.testStarts[j]))
+
+        windows = list()
+        for nameX, nameY, starts in sets:
+            for name, offset, width, dilation in [(nameX, 0, self.numInputs, self.dilation),
+                                                  (nameY, self.numInputs*self.dilation, self.numOutputs, self.targetDilation)]:
+                out = np.lib.format.open_memmap(os.path.join(directory, name + ".npy"), mode="w+",
+                                                dtype=sequence.dtype if dtype is None else dtype,
+                                                shape=(len(starts), width) + sequence.shape[1:])
+                windows.append(gather_windows(sequence, np.asarray(starts, dtype=np.intp)+offset, width, out=out,
+                                              dilation=dilation))
+
+        return tuple(windows)
+
+    def iter_folds(self, sequence, dtype=None):
+        """ Yields the windows of one train/val(/test) split at a time
+
+        Parameters:
+            sequence (array)  : Full training dataset the plan was computed for
+            dtype (dtype)     : Type of the windows, cast while they are gathered. None keeps the sequence dtype
+
+        Yields:
+            j (int)       : Index of the split
+            train (tuple) : (X, y) training windows
+            cv (tuple)    : (Xcv, ycv) cross-validation windows
+            test (tuple)  : (Xtest, ytest) test windows, only if the plan has a test set
+
+        """
+
+        for j in range(len(self)):
+            windows = self.fold(j, sequence, dtype)
+            yield (j,) + tuple(windows[k:k+2] for k in range(0, len(windows), 2))
+
+    def materialize(self, sequence, dtype=None):
+        """ Returns the windows of every split as the dictionaries returned by the splitters
+
+        Parameters:
+            sequence (array)  : Full training dataset the plan was computed for
+            dtype (dtype)     : Type of the windows, cast while they are gathered. None keeps the sequence dtype
+
+        Returns:
+            X, y, Xcv, ycv (dict)  : Training and cross-validation windows of each split
+            Xtest, ytest (dict)    : Test windows of each split, only if the plan has a test set
+
+        """
+
+        numSets = 4 if self.testStarts is None else 6
+        sets = tuple(dict() for _ in range(numSets))
+        for j in range(len(self)):
+            for d, windows in zip(sets, self.fold(j, sequence, dtype)):
+                d[j] = windows
+
+        return sets
+
+    def share(self, sequence, dtype=None):
+        """ Returns the splits with every distinct window stored once, each split holding only indices into them
+
+        Parameters:
+            sequence (array)  : Full training dataset the plan was computed for
+            dtype (dtype)     : Type of the windows, cast while they are gathered. None keeps the sequence dtype
+
+        Returns:
+            folds (SharedFolds): Distinct windows and per-split indices, gathered into folds on demand
+
+        """
+
+        sets = [self.trainStarts, self.cvStarts] + ([] if self.testStarts is None else [self.testStarts])
+        allStarts = [np.asarray(starts) for folds in sets for starts in folds]
+        starts = np.unique(np.concatenate(allStarts)) if allStarts else np.empty(0, dtype=np.intp)
+
+        X, y = self._windows(sequence, starts, dtype)
+        indices = [[np.searchsorted(starts, fold).astype(index_dtype(len(starts))) for fold in folds] for folds in sets]
+
+        return SharedFolds(X, y, *indices)
+
+
+class SharedFolds:
+    """ Train/val(/test) splits stored without repeating the windows they have in common
+        i.e. fold j trains on X[trainIndex[j]], y[trainIndex[j]] and validates on X[cvIndex[j]], y[cvIndex[j]]
+
+        K-Fold and Group K-Fold splits share most of their training windows, so the memory of
+        the distinct windows is roughly that of a single split instead of one per split
+
+    Attributes:
+        X (array)           : Inputs of every distinct window, in start order
+        y (array)           : Outputs of every distinct window, in start order
+        trainIndex (list)   : Integer array of the training windows, one per fold
+        cvIndex (list)      : Integer array of the cross-validation windows, one per fold
+        testIndex (list)    : Integer array of the test windows, one per fold (None for train/val splits)
+
+    """
+
+    def __init__(self, X, y, trainIndex, cvIndex, testIndex=None):
+        self.X = X
+        self.y = y
+        self.trainIndex = trainIndex
+        self.cvIndex = cvIndex
+        self.testIndex = testIndex
+
+    def __len__(self):
+        return len(self.trainIndex)
+
+    def __repr__(self):
+        return "SharedFolds(numFolds=%d, numWindows=%d, test=%s)" % (len(self), len(self.X), self.testIndex is not None)
+
+    @property
+    def nbytes(self):
+        """ Bytes held by the distinct windows and the indices """
+        indices = self.trainIndex + self.cvIndex + (self.testIndex or [])
+        return self.X.nbytes + self.y.nbytes + sum(index.nbytes for index in indices)
+
+    def fold(self, j):
+        """ Returns the windows of a single train/val(/test) split, gathered from the distinct windows
+
+        Parameters:
+            j (int)  : Index of the split
+
+        Returns:
+            X, y, Xcv, ycv (2D arrays)  : Training and cross-validation windows
+            Xtest, ytest (2D arrays)    : Test windows, only if the splits have a test set
+
+        """
+
+        sets = [self.trainIndex, self.cvIndex] + ([] if self.testIndex is None else [self.testIndex])
+        windows = list()
+        for indices in sets:
+            windows.append(self.X[indices[j]])
+            windows.append(self.y[indices[j]])
+
+        return tuple(windows)
+
+    def iter_folds(self):
+        """ Yields (j, (X, y), (Xcv, ycv)[, (Xtest, ytest)]) for one split at a time, as SplitPlan.iter_folds """
+
+        for j in range(len(self)):
+            windows = self.fold(j)
+            yield (j,) + tuple(windows[k:k+2] for k in range(0, len(windows), 2))
+
+
+def compact_starts(starts, lenSequence):
+    """ Returns window starts stored in the smallest integer type that holds any index of the sequence
+
+    Parameters:
+        starts (array)     : Window starts
+        lenSequence (int)  : Number of samples in the sequence
+
+    Returns:
+        starts (array): Same starts, typed by index_dtype(lenSequence)
+
+    """
+
+    return np.asarray(starts).astype(index_dtype(lenSequence), copy=False)
+
+
+def interleaved_starts(numPositions, period, cvOffset, numJumps, toCv, fromCv):
+    """ Returns the starts of a run of training windows interleaved with cv windows, computed in closed form
+        i.e. positions cvOffset, cvOffset+period, cvOffset+2*period, ... hold a cv window and the others a training window,
+             consecutive training windows are numJumps apart, a cv window starts toCv after the previous training window
+             and the next training window starts fromCv after the cv window
+
+    Parameters:
+        numPositions (int)  : Number of window positions
+        period (int)        : Number of positions between consecutive cv windows
+        cvOffset (int)      : Position of the first cv window
+        numJumps (int)      : Number of sequence samples between consecutive training windows
+        toCv (int)          : Number of sequence samples between a training window and the cv window after it
+        fromCv (int)        : Number of sequence samples between a cv window and the training window after it
+
+    Returns:
+        starts (array)  : Start of the window at each position
+        isCv (array)    : True where the position holds a cv window
+
+    """
+
+    positions = np.arange(numPositions)
+    isCv = (positions >= cvOffset) & ((positions-cvOffset) % period == 0)
+    starts = interleaved_start(positions, period, cvOffset, numJumps, toCv, fromCv)
+
+    return starts, isCv
+
+
+def interleaved_end(period, cvOffset, numJumps, toCv, fromCv, trainLimit, cvLimit):
+    """ Returns the first position of the run of interleaved_starts whose training window starts after trainLimit,
+        or whose cv window starts after cvLimit, found by binary search over the closed form starts
+
+    Parameters:
+        period, cvOffset, numJumps, toCv, fromCv  : Layout of the run, see interleaved_starts
+        trainLimit (int)                          : Last valid start of a training window
+        cvLimit (int)                             : Last valid start of a cv window
+
+    Returns:
+        end (int): Number of positions before the run leaves the sequence
+
+    """
+
+    start = lambda position: interleaved_start(position, period, cvOffset, numJumps, toCv, fromCv)
+
+    def first_after(limit):
+        lo, hi = 0, 1
+        while start(hi) <= limit:
+            lo, hi = hi, 2*hi
+        while lo < hi:
+            mid = (lo+hi)//2
+            if start(mid) > limit:
+                hi = mid
+            else:
+                lo = mid+1
+        return lo
+
+    isCv = lambda position: position >= cvOffset and (position-cvOffset) % period == 0
+
+    # Starts increase with the position and cv windows are never adjacent, so the training window
+    # after a crossing cv position crosses as well, and the next cv position is found arithmetically
+    endTrain = first_after(trainLimit)
+    if isCv(endTrain):
+        endTrain += 1
+    endCv = max(first_after(cvLimit), cvOffset)
+    endCv += -(endCv-cvOffset) % period
+
+    return min(endTrain, endCv)
+
+
+def interleaved_start(position, period, cvOffset, numJumps, toCv, fromCv):
+    """ Returns the start of the window at the given position(s) of the run of interleaved_starts
+
+    Parameters:
+        position (int or array)                   : Window position(s)
+        period, cvOffset, numJumps, toCv, fromCv  : Layout of the run, see interleaved_starts
+
+    Returns:
+        start (int or array): Start of the window at each position
+
+    """
+
+    # Number of cv positions in 0..last
+    numCv = lambda last: np.maximum(0, (last-cvOffset)//period + 1)
+    return numJumps*position + (toCv-numJumps)*(numCv(position)-numCv(0)) + (fromCv-numJumps)*numCv(position-1)
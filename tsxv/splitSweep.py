@@ -0,0 +1,92 @@
+"""
+Splits of a grid of window configurations (numInputs, numOutputs, numJumps) over one shared sequence
+"""
+
+import itertools
+
+from .windows import as_sequence
+
+
+def window_grid(numInputs, numOutputs, numJumps):
+    """ Returns every (numInputs, numOutputs, numJumps) combination of the given values
+
+    Parameters:
+        numInputs (list)   : Values of numInputs to try
+        numOutputs (list)  : Values of numOutputs to try
+        numJumps (list)    : Values of numJumps to try
+
+    Returns:
+        grid (list): (numInputs, numOutputs, numJumps) tuples
+
+    """
+
+    return list(itertools.product(numInputs, numOutputs, numJumps))
+
+
+class SplitSweep:
+    """ Splits of one splitter for every window configuration of a grid, addressable by configuration tuple
+        i.e. sweep = SplitSweep(plan_train_val_kFold, sequence, window_grid([10, 20], [1], [1, 5]))
+             plan = sweep[(10, 1, 5)]
+             X, y, Xcv, ycv = sweep.fold((10, 1, 5), 0)
+
+        The sequence is loaded once and every configuration only computes the integer window starts of its
+        splits (a SplitPlan), on first access. Windows are gathered from the shared sequence on demand
+
+    Attributes:
+        planner (function)  : One of the plan_* functions
+        sequence (array)    : Full training dataset, shared by every configuration
+        grid (list)         : (numInputs, numOutputs, numJumps) configurations
+        kwargs (dict)       : Extra arguments of the planner, e.g. numGroups
+
+    """
+
+    def __init__(self, planner, sequence, grid, **kwargs):
+        self.planner = planner
+        self.sequence = as_sequence(sequence)
+        self.grid = [tuple(config) for config in grid]
+        self.kwargs = kwargs
+        self._plans = dict()
+
+    def __len__(self):
+        return len(self.grid)
+
+    def __iter__(self):
+        return iter(self.grid)
+
+    def __contains__(self, config):
+        return tuple(config) in self.grid
+
+    def __getitem__(self, config):
+        config = tuple(config)
+        if config not in self._plans:
+            if config not in self.grid:
+                raise KeyError(config)
+            self._plans[config] = self.planner(len(self.sequence), *config, **self.kwargs)
+
+        return self._plans[config]
+
+    def items(self):
+        """ Yields every (configuration, SplitPlan) pair of the grid """
+
+        for config in self.grid:
+            yield config, self[config]
+
+    def fold(self, config, j):
+        """ Returns the windows of split j of a configuration
+
+        Parameters:
+            config (tuple)  : (numInputs, numOutputs, numJumps) configuration of the grid
+            j (int)         : Index of the split
+
+        Returns:
+            X, y, Xcv, ycv (2D arrays)  : Training and cross-validation windows
+            Xtest, ytest (2D arrays)    : Test windows, only if the splitter has a test set
+
+        """
+
+        return self[config].fold(j, self.sequence)
+
+    def num_folds(self):
+        """ Returns the number of splits of every configuration """
+
+        return {config: len(plan) for config, plan in self.items()}
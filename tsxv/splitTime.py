@@ -0,0 +1,213 @@
+"""
+Timestamp-aware splitting: window sizes given as durations over an irregularly sampled, sorted time index
+"""
+
+import numpy as np
+
+from .diagnostics import warn_short
+from .windows import as_sequence, index_dtype
+
+
+def _time_units(timestamps, duration):
+    """ Returns a duration as a number of time units of the timestamps """
+
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        unit = np.datetime_data(timestamps.dtype)[0]
+        units = int(np.timedelta64(duration).astype("m8[%s]" % unit).astype(np.int64))
+    else:
+        units = duration
+
+    if (units <= 0):
+        raise ValueError("Durations must be positive in the time unit of the timestamps, got %s" % duration)
+
+    return units
+
+
+class TimeSplitPlan:
+    """ Sample boundaries of every window of the folds produced by a splitter on a time index
+        i.e. X = sequence[bounds[k, 0]:bounds[k, 1]]
+             y = sequence[bounds[k, 1]:bounds[k, 2]]
+             for every row k of the fold's train, cv or test bounds
+
+    Attributes:
+        trainBounds (list)  : Integer array of shape (windows, 3) per fold, for the training windows
+        cvBounds (list)     : Integer array of shape (windows, 3) per fold, for the cross-validation windows
+        testBounds (list)   : Integer array of shape (windows, 3) per fold, for the test windows (None for train/val splits)
+
+    """
+
+    def __init__(self, trainBounds, cvBounds, testBounds=None):
+        self.trainBounds = trainBounds
+        self.cvBounds = cvBounds
+        self.testBounds = testBounds
+
+    def __len__(self):
+        return len(self.trainBounds)
+
+    def __repr__(self):
+        return "TimeSplitPlan(numFolds=%d, test=%s)" % (len(self), self.testBounds is not None)
+
+    @staticmethod
+    def _windows(sequence, bounds):
+        X = [sequence[a:b] for a, b, _ in bounds]
+        y = [sequence[b:c] for _, b, c in bounds]
+        return X, y
+
+    def fold(self, j, sequence):
+        """ Returns the windows of a single train/val(/test) split
+
+        Parameters:
+            j (int)           : Index of the split
+            sequence (array)  : Full training dataset, one sample per timestamp
+
+        Returns:
+            X, y, Xcv, ycv (list)  : Views of the training and cross-validation windows, of variable length
+            Xtest, ytest (list)    : Views of the test windows, only if the plan has a test set
+
+        """
+
+        X, y = self._windows(sequence, self.trainBounds[j])
+        Xcv, ycv = self._windows(sequence, self.cvBounds[j])
+        if self.testBounds is None:
+            return X, y, Xcv, ycv
+
+        Xtest, ytest = self._windows(sequence, self.testBounds[j])
+        return X, y, Xcv, ycv, Xtest, ytest
+
+    def materialize(self, sequence):
+        """ Returns the windows of every split as the dictionaries returned by the splitters
+
+        Parameters:
+            sequence (array)  : Full training dataset, one sample per timestamp
+
+        Returns:
+            X, y, Xcv, ycv (dict)  : Lists of training and cross-validation windows of each split
+            Xtest, ytest (dict)    : Lists of test windows of each split, only if the plan has a test set
+
+        """
+
+        numSets = 4 if self.testBounds is None else 6
+        sets = tuple(dict() for _ in range(numSets))
+        for j in range(len(self)):
+            for d, windows in zip(sets, self.fold(j, sequence)):
+                d[j] = windows
+
+        return sets
+
+
+def plan_time(planner, timestamps, numInputs, numOutputs, numJumps, end=None, dropEmpty=True, **kwargs):
+    """ Returns the sample boundaries of the splits a plan_* function makes when window sizes are durations
+        i.e. X covers the samples with timestamps in [t, t+numInputs), y those in [t+numInputs, t+numInputs+numOutputs)
+
+        The planner lays the windows out on the time axis as if it had one sample per time unit,
+        then every window boundary is mapped to a sample index with a vectorized searchsorted. Starts that
+        splits share as slices of one array (e.g. the forward chaining training prefixes) are mapped once.
+        With dropEmpty, splits left without training, cv (or test) windows by gaps in the timestamps are
+        dropped, the others renumbered, and a ShortSequenceWarning reports how many were dropped
+
+    Parameters:
+        planner (function)  : One of the plan_* functions, e.g. plan_train_val_kFold
+        timestamps (array)  : Sorted datetime64 (or integer) time of each sample
+        numInputs           : Duration of the inputs X, e.g. np.timedelta64(30, 'D') or datetime.timedelta(days=30)
+        numOutputs          : Duration of the outputs y
+        numJumps            : Duration between the start of consecutive windows
+        end                 : Time the series ends, windows must finish by then. Defaults to one
+                              time unit after the last timestamp
+        dropEmpty (bool)    : Whether windows without any sample in their inputs or outputs are dropped
+        **kwargs            : Extra arguments of the planner, e.g. numGroups
+
+    Returns:
+        plan (TimeSplitPlan): Sample boundaries of the training, cross-validation (and test) windows of each split
+
+    """
+
+    timestamps = np.asarray(timestamps)
+    if (len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1])):
+        raise ValueError("The timestamps must be sorted")
+
+    widths = [_time_units(timestamps, duration) for duration in (numInputs, numOutputs, numJumps)]
+    if (len(timestamps) == 0):
+        times = np.empty(0, dtype=np.int64)
+        lenTime = 0
+    else:
+        times = timestamps - timestamps[0]
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            times = times.astype(np.int64)
+        lenTime = (_time_units(timestamps, np.asarray(end, dtype=timestamps.dtype) - timestamps[0]) if end is not None
+                   else int(times[-1]) + 1)
+
+    plan = planner(lenTime, *widths, **kwargs)
+
+    def all_bounds(starts):
+        starts = np.asarray(starts, dtype=np.int64)
+        edges = np.stack((starts, starts+widths[0], starts+widths[0]+widths[1]), axis=1)
+        ix = np.searchsorted(times, edges, side="left").astype(index_dtype(len(times)))
+        kept = (ix[:, 0] < ix[:, 1]) & (ix[:, 1] < ix[:, 2]) if dropEmpty else np.ones(len(ix), dtype=bool)
+        return ix[kept], np.concatenate(([0], np.cumsum(kept)))
+
+    # Bounds of every array of starts the splits are slices of, computed once
+    shared = dict()
+
+    def bounds(starts):
+        base, offset = _slice_of(np.asarray(starts))
+        if id(base) not in shared:
+            shared[id(base)] = (base,) + all_bounds(base)
+        _, ix, numKept = shared[id(base)]
+        return ix[numKept[offset]:numKept[offset+len(starts)]]
+
+    trainBounds = [bounds(starts) for starts in plan.trainStarts]
+    cvBounds = [bounds(starts) for starts in plan.cvStarts]
+    testBounds = None if plan.testStarts is None else [bounds(starts) for starts in plan.testStarts]
+
+    if dropEmpty:
+        sets = [trainBounds, cvBounds] + ([] if testBounds is None else [testBounds])
+        kept = [j for j in range(len(plan)) if all(len(folds[j]) for folds in sets)]
+        if (len(kept) < len(plan)):
+            warn_short("%d of %d splits have no sample in some of their training, cv or test windows and were dropped"
+                       % (len(plan)-len(kept), len(plan)), "plan_time", len(timestamps), numInputs, numOutputs, numJumps)
+            trainBounds, cvBounds = [trainBounds[j] for j in kept], [cvBounds[j] for j in kept]
+            testBounds = None if testBounds is None else [testBounds[j] for j in kept]
+
+    return TimeSplitPlan(trainBounds, cvBounds, testBounds)
+
+
+def _slice_of(starts):
+    """ Returns (base, offset) when starts is a contiguous slice of a larger 1D array, (starts, 0) otherwise """
+
+    base = starts.base
+    if (isinstance(base, np.ndarray) and base.ndim == 1 and base.dtype == starts.dtype and starts.ndim == 1
+            and base.flags.c_contiguous and starts.strides[0] == starts.itemsize):
+        offset = (starts.__array_interface__["data"][0] - base.__array_interface__["data"][0])//starts.itemsize
+        if (0 <= offset and offset+len(starts) <= len(base)):
+            return base, offset
+
+    return starts, 0
+
+
+def split_time(planner, sequence, timestamps, numInputs, numOutputs, numJumps, end=None, dropEmpty=True, **kwargs):
+    """ Returns sets to train and cross-validate (and test) a model with window sizes given as durations
+
+    Parameters:
+        planner (function)  : One of the plan_* functions, e.g. plan_train_val_kFold
+        sequence (array)    : Full training dataset, one sample per timestamp, or path to a .npy file
+        timestamps (array)  : Sorted datetime64 (or integer) time of each sample
+        numInputs           : Duration of the inputs X, e.g. np.timedelta64(30, 'D')
+        numOutputs          : Duration of the outputs y
+        numJumps            : Duration between the start of consecutive windows
+        end                 : Time the series ends, defaults to one time unit after the last timestamp
+        dropEmpty (bool)    : Whether windows without any sample in their inputs or outputs are dropped
+        **kwargs            : Extra arguments of the planner, e.g. numGroups
+
+    Returns:
+        X, y, Xcv, ycv (dict)  : Lists of training and cross-validation windows of each split, views over sequence
+        Xtest, ytest (dict)    : Lists of test windows of each split, only with a train/val/test planner
+
+    """
+
+    sequence = as_sequence(sequence)
+    if (len(sequence) != len(timestamps)):
+        raise ValueError("The sequence and the timestamps must have the same length")
+
+    plan = plan_time(planner, timestamps, numInputs, numOutputs, numJumps, end, dropEmpty, **kwargs)
+
+    return plan.materialize(sequence)
@@ -2,54 +2,165 @@
 Algorithm to separate a given training set into input X and outputs y
 """
 
+import time
+
 import numpy as np
 
+from .diagnostics import report_split, warn_short
+from .windowStats import window_stats
+from .windows import as_sequence, load_sequence, index_dtype, window_count, strided_windows, panel_windows
+
 
-def split_train(sequence, numInputs, numOutputs, numJumps):
+def split_train(sequence, numInputs, numOutputs, numJumps, asList=False, targetColumns=None, dtype=None, withStats=False,
+                dilation=1, targetDilation=1):
     """ Returns sets to train a model
         i.e. X[0] = sequence[0], ..., sequence[numInputs]
              y[0] = sequence[numInputs+1], ..., sequence[numInputs+numOutputs]
              ...
              X[k] = sequence[k*numJumps], ..., sequence[k*numJumps+numInputs]
              y[k] = sequence[k*numJumps+numInputs+1], ..., sequence[k*numJumps+numInputs+numOutputs]
+             with dilation d and targetDilation t, X[k] takes every d-th sample of numInputs*d samples
+             and y[k] every t-th sample of the numOutputs*t samples that follow
     
     Parameters:
-        sequence (array)  : Full training dataset
+        sequence (array)  : Full training dataset, or path to a .npy file
         numInputs (int)   : Number of inputs X used at each training
         numOutputs (int)  : Number of outputs y used at each training
         numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        asList (bool)     : If True, return lists of slices instead of strided views
+        targetColumns     : For a (time, features) sequence, feature column(s) kept in y,
+                            an int or slice keeps y a view. None keeps every column
+        dtype (dtype)     : Type of the windows, e.g. np.float32. The sequence is cast once
+                            and X, y are views over the cast copy
+        withStats (bool)  : If True, also return the mean, std, min and max of every X[k],
+                            computed in O(len(sequence)) from cumulative sums
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
 
     Returns:
-        X (2D array): Array of numInputs arrays.
-                      len(X[k]) = numInputs
-        y (2D array): Array of numOutputs arrays 
+        X (2D array): Array of numInputs arrays, read-only view over sequence.
+                      len(X[k]) = numInputs, X.shape = (numSets, numInputs, *sequence.shape[1:])
+        y (2D array): Array of numOutputs arrays, read-only view over sequence.
                       len(y[k]) = numOutputs
+        stats (WindowStats): Statistics of each X[k], only if withStats
                       
     """
     
-    X, y = list(), list()
+    begin = time.perf_counter()
+    sequence = source = load_sequence(sequence)
+    if dtype is not None:
+        sequence = as_sequence(sequence).astype(dtype, copy=False)
     
-    if (numInputs+numOutputs > len(sequence)):
-        print("To have at least one X,y arrays, the sequence size needs to be bigger than numInputs+numOutputs")
-        return X, y
+    inputSpan, outputSpan = numInputs*dilation, numOutputs*targetDilation
+    numWindows = window_count(len(sequence), inputSpan+outputSpan, numJumps)
+    indexed = time.perf_counter()
     
-    for i in range(len(sequence)):
-        i = numJumps*i;
-        end_ix = i + numInputs
-
-        # Once train data crosses time series length return   
-        if end_ix+numOutputs > len(sequence):
-            break
-        
-        seq_x = sequence[i:end_ix] 
-        X.append(seq_x)
-        seq_y = sequence[end_ix:end_ix+numOutputs]
-        y.append(seq_y)
+    if (inputSpan+outputSpan > len(sequence)):
+        warn_short("To have at least one X,y arrays, the sequence size needs to be bigger than numInputs+numOutputs",
+                   "split_train", len(sequence), inputSpan, outputSpan, numJumps)
+    
+    if asList:
+        starts = numJumps*np.arange(numWindows)
+        X = [sequence[i:i+inputSpan:dilation] for i in starts]
+        y = [sequence[i+inputSpan:i+inputSpan+outputSpan:targetDilation] for i in starts]
+        if targetColumns is not None:
+            y = [np.asarray(seq_y)[:, targetColumns] for seq_y in y]
+    else:
+        X = strided_windows(sequence, 0, numInputs, numWindows, numJumps, dilation)
+        y = strided_windows(sequence, inputSpan, numOutputs, numWindows, numJumps, targetDilation)
+        if targetColumns is not None:
+            y = y[:, :, targetColumns]
+    
+    result = (X, y, window_stats(sequence, numJumps*np.arange(numWindows), numInputs, dilation)) if withStats else (X, y)
+    report_split("split_train", sequence, result, begin, indexed, None, numWindows, source)
         
-    return X, y
+    return result
+
+
+def split_train_panel(panel, numInputs, numOutputs, numJumps, targetColumns=None, asViews=False, dtype=None):
+    """ Returns sets to train a model on every series of a panel in a single vectorized call
+        i.e. X[s*numSets+k] = panel[s, k*numJumps], ..., panel[s, k*numJumps+numInputs]
+             y[s*numSets+k] = panel[s, k*numJumps+numInputs+1], ..., panel[s, k*numJumps+numInputs+numOutputs]
+             seriesIds[s*numSets+k] = s
+    
+    Parameters:
+        panel (array)     : Series of equal length, shaped (series, time) or (series, time, features)
+        numInputs (int)   : Number of inputs X used at each training
+        numOutputs (int)  : Number of outputs y used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        targetColumns     : Feature column(s) kept in y, None keeps every column
+        asViews (bool)    : If True, return read-only strided views shaped (series, numSets, ...) instead
+                            of contiguous arrays shaped (series*numSets, ...)
+        dtype (dtype)     : Type of X and y, e.g. np.float32, cast once while they are copied.
+                            With asViews the panel is cast once and the views are taken over the cast copy
+
+    Returns:
+        X (array)           : Inputs, shaped (series*numSets, numInputs, features)
+        y (array)           : Outputs, shaped (series*numSets, numOutputs, features)
+        seriesIds (array)   : Index of the series of each (X,y) set, in the smallest integer type that fits
+                      
+    """
+    
+    begin = time.perf_counter()
+    panel = source = as_sequence(load_sequence(panel))
+    if (asViews and dtype is not None):
+        panel = panel.astype(dtype, copy=False)
+    
+    numWindows = window_count(panel.shape[1], numInputs+numOutputs, numJumps)
+    
+    if (numInputs+numOutputs > panel.shape[1]):
+        warn_short("To have at least one X,y arrays, the series size needs to be bigger than numInputs+numOutputs",
+                   "split_train_panel", panel.shape[1], numInputs, numOutputs, numJumps)
+    
+    X = panel_windows(panel, 0, numInputs, numWindows, numJumps)
+    y = panel_windows(panel, numInputs, numOutputs, numWindows, numJumps)
+    if targetColumns is not None:
+        y = y[:, :, :, targetColumns]
+    seriesIds = np.repeat(np.arange(panel.shape[0], dtype=index_dtype(panel.shape[0])), numWindows)
+    indexed = time.perf_counter()
+    
+    if not asViews:
+        # A single assignment copies (and casts) every window of the panel into one contiguous array
+        X = _contiguous(X, dtype).reshape((-1,) + X.shape[2:])
+        y = _contiguous(y, dtype).reshape((-1,) + y.shape[2:])
+    
+    report_split("split_train_panel", panel, (X, y, seriesIds), begin, indexed, None, len(seriesIds), source)
+    
+    return X, y, seriesIds
+
+
+def _contiguous(windows, dtype):
+    out = np.empty(windows.shape, dtype=windows.dtype if dtype is None else dtype)
+    out[...] = windows
+    return out
+
+
+def iter_split_train(sequence, numInputs, numOutputs, numJumps, chunkSize=65536, dilation=1, targetDilation=1):
+    """ Yields the sets of split_train in chunks of at most chunkSize (X,y) sets,
+        so that a memory-mapped sequence is only paged in one chunk at a time
+    
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+        numInputs (int)   : Number of inputs X used at each training
+        numOutputs (int)  : Number of outputs y used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        chunkSize (int)   : Maximum number of (X,y) sets per chunk
+        dilation (int)    : Number of sequence samples between consecutive inputs
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Yields:
+        X (2D array): Read-only view of the chunk numInputs arrays
+        y (2D array): Read-only view of the chunk numOutputs arrays
+                      
+    """
+    
+    X, y = split_train(sequence, numInputs, numOutputs, numJumps, dilation=dilation, targetDilation=targetDilation)
+    
+    for i in range(0, len(X), chunkSize):
+        yield X[i:i+chunkSize], y[i:i+chunkSize]
 
 
-def split_train_variableInput(sequence, minSamplesTrain, numOutputs, numJumps):
+def split_train_variableInput(sequence, minSamplesTrain, numOutputs, numJumps, asList=False, dtype=None):
     """ Returns sets to train a model with variable input length
         i.e. X[0] = sequence[0], ..., sequence[minSamplesTrain]
              y[0] = sequence[0], ..., sequence[minSamplesTrain+numOutputs]
@@ -58,42 +169,123 @@ def split_train_variableInput(sequence, minSamplesTrain, numOutputs, numJumps):
              y[k] = sequence[0], ..., sequence[k*numJumps+minSamplesTrain+numOutputs]
              
     Parameters:
-        sequence (array)       : Full training dataset
+        sequence (array)       : Full training dataset, or path to a .npy file
         minSamplesTrain (int)  : Minimum number of inputs X used at each training
         numOutputs (int)       : Number of outputs y used at each training
         numJumps (int)         : Number of sequence samples to be jumped between (X,y) sets
+        asList (bool)          : If True, return y as a list of slices instead of a strided view
+        dtype (dtype)          : Type of X and y, e.g. np.float32. The sequence is cast once
+                                 and X, y are views over the cast copy
 
     Returns:
-        X (2D array): Array of input arrays.
+        X (list)    : List of input arrays, each one a prefix of sequence.
                       len(X[k]) = minSamplesTrain + k*numJumps
-        y (2D array): Array of numOutputs arrays 
+        y (2D array): Array of numOutputs arrays, read-only view over sequence.
                       len(y[k]) = minSamplesTrain+numOutputs+k*numJumps
 
     """
     
-    end_ix=0; i=0;
-    X, y = list(), list()
+    begin = time.perf_counter()
+    sequence = source = load_sequence(sequence)
+    if dtype is not None:
+        sequence = as_sequence(sequence).astype(dtype, copy=False)
+    
+    numWindows = window_count(len(sequence), minSamplesTrain+numOutputs, numJumps)
     
     if (minSamplesTrain+numOutputs > len(sequence)):
-        print("To have at least one X,y arrays, the sequence size needs to be bigger than minSamplesTrain+numOutputs")
-        return X, y
-        
-    # Iterate through all validation splits
-    while 1:
-        end_ix = minSamplesTrain + numJumps*i;
-        
-        # Training X
-        seq_x = sequence[0:end_ix] 
-        X.append(seq_x)
-        
-        # Training y
-        seq_y = sequence[end_ix:end_ix+numOutputs]
-        y.append(seq_y)
-
-        i+=1;
-          
-        # Once val data crosses time series length return   
-        if ((minSamplesTrain + numJumps*i + numOutputs) > len(sequence)):
-            break
+        warn_short("To have at least one X,y arrays, the sequence size needs to be bigger than minSamplesTrain+numOutputs",
+                   "split_train_variableInput", len(sequence), minSamplesTrain, numOutputs, numJumps)
+    
+    # Training X are prefixes of the sequence, so slicing them never copies an array
+    ends = minSamplesTrain + numJumps*np.arange(numWindows)
+    indexed = time.perf_counter()
+    X = [sequence[0:end_ix] for end_ix in ends]
+    
+    if asList:
+        y = [sequence[end_ix:end_ix+numOutputs] for end_ix in ends]
+    else:
+        y = strided_windows(sequence, minSamplesTrain, numOutputs, numWindows, numJumps)
+    
+    report_split("split_train_variableInput", sequence, (X, y), begin, indexed, None, numWindows, source)
             
     return X, y
+
+
+def split_train_variableInput_offsets(sequence, minSamplesTrain, numOutputs, numJumps):
+    """ Returns the sets of split_train_variableInput in compact form: the end of each input prefix
+        i.e. X[k] = sequence[0:ends[k]]
+             ends[k] = minSamplesTrain + k*numJumps
+             
+    Parameters:
+        sequence (array)       : Full training dataset, or path to a .npy file
+        minSamplesTrain (int)  : Minimum number of inputs X used at each training
+        numOutputs (int)       : Number of outputs y used at each training
+        numJumps (int)         : Number of sequence samples to be jumped between (X,y) sets
+
+    Returns:
+        ends (array)    : Number of inputs of each X, i.e. end offset of each prefix in sequence,
+                          in the smallest integer type that fits
+        y (2D array)    : Array of numOutputs arrays, read-only view over sequence
+
+    """
+    
+    begin = time.perf_counter()
+    sequence = load_sequence(sequence)
+    ends, y = _variableInput_offsets(sequence, minSamplesTrain, numOutputs, numJumps, "split_train_variableInput_offsets")
+    report_split("split_train_variableInput_offsets", sequence, (ends, y), begin, time.perf_counter(), None, len(ends))
+    
+    return ends, y
+
+
+def _variableInput_offsets(sequence, minSamplesTrain, numOutputs, numJumps, splitter):
+    numWindows = window_count(len(sequence), minSamplesTrain+numOutputs, numJumps)
+    
+    if (minSamplesTrain+numOutputs > len(sequence)):
+        warn_short("To have at least one X,y arrays, the sequence size needs to be bigger than minSamplesTrain+numOutputs",
+                   splitter, len(sequence), minSamplesTrain, numOutputs, numJumps, stacklevel=4)
+    
+    ends = (minSamplesTrain + numJumps*np.arange(numWindows)).astype(index_dtype(len(sequence)))
+    y = strided_windows(sequence, minSamplesTrain, numOutputs, numWindows, numJumps)
+    
+    return ends, y
+
+
+def split_train_variableInput_padded(sequence, minSamplesTrain, numOutputs, numJumps, asMask=False, padValue=0, dtype=None):
+    """ Returns the sets of split_train_variableInput as one right-aligned padded array
+        i.e. X[k] = padValue, ..., padValue, sequence[0], ..., sequence[k*numJumps+minSamplesTrain-1]
+             len(X[k]) = len(X[-1]) for every k
+             
+    Parameters:
+        sequence (array)       : Full training dataset, or path to a .npy file
+        minSamplesTrain (int)  : Minimum number of inputs X used at each training
+        numOutputs (int)       : Number of outputs y used at each training
+        numJumps (int)         : Number of sequence samples to be jumped between (X,y) sets
+        asMask (bool)          : If True, return a boolean mask of the inputs instead of their lengths
+        padValue (scalar)      : Value placed before the inputs of the shorter X
+        dtype (dtype)          : Type of the padded buffer (and of y), e.g. np.float32. None keeps the sequence dtype
+
+    Returns:
+        X (2D array)        : Padded inputs, a read-only view over a single buffer of 2*len(X[-1]) samples
+        lengths (array)     : Number of inputs of each X, or, if asMask, a 2D boolean array
+                              which is True where X holds a sequence sample
+        y (2D array)        : Array of numOutputs arrays, read-only view over sequence
+
+    """
+    
+    begin = time.perf_counter()
+    source = load_sequence(sequence)
+    ends, y = _variableInput_offsets(source, minSamplesTrain, numOutputs, numJumps, "split_train_variableInput_padded")
+    indexed = time.perf_counter()
+    sequence = as_sequence(source)
+    maxLen = int(ends[-1]) if len(ends) > 0 else 0
+    if dtype is not None:
+        y = y.astype(dtype)
+    
+    # Row k of X is the window of the padded buffer ending where the prefix of sequence ends
+    padded = np.full((2*maxLen,) + sequence.shape[1:], padValue, dtype=sequence.dtype if dtype is None else dtype)
+    padded[maxLen:] = sequence[:maxLen]
+    X = strided_windows(padded, minSamplesTrain, maxLen, len(ends), numJumps)
+    lengths = np.arange(maxLen) >= (maxLen - ends)[:, None] if asMask else ends
+    report_split("split_train_variableInput_padded", source, (X, lengths, y), begin, indexed, None, len(ends))
+    
+    return X, lengths, y
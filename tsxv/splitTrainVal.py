@@ -2,16 +2,28 @@
 Forward Chaining, K-Fold and Group K-Fold algorithms to split a given training dataset into train (X, y) and validation (Xcv, ycv) sets
 """
 
+import time
+
 import numpy as np
 
-def split_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps):
+from .diagnostics import count_windows, report_split, warn_short
+from .splitPlan import SplitPlan, compact_starts, interleaved_starts, interleaved_end
+from .windows import as_sequence, load_sequence, sequence_length, window_count, strided_windows
+
+def split_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps, asViews=False, dtype=None, dilation=1, targetDilation=1):
     """ Returns sets to train and cross-validate a model using forward chaining technique
     
     Parameters:
-        sequence (array)  : Full training dataset
+        sequence (array)  : Full training dataset, or path to a .npy file
         numInputs (int)   : Number of inputs X and Xcv used at each training and validation
         numOutputs (int)  : Number of outputs y and ycv used at each training and validation
         numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        asViews (bool)    : If True, each fold is a read-only view of one shared window matrix
+                            instead of a copy, so memory grows linearly with the number of folds
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast once while they are built.
+                            With asViews the sequence is cast once and the views are taken over the cast copy
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
 
     Returns:
         X (2D array)    : Array of numInputs arrays used for training
@@ -21,63 +33,59 @@ def split_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps):
         
     """
     
+    begin = time.perf_counter()
+    sequence = source = load_sequence(sequence)
+    if (asViews and dtype is not None):
+        sequence = as_sequence(sequence).astype(dtype, copy=False)
+    
     X, y, Xcv, ycv = dict(), dict(), dict(), dict()
-    j=2; # Tracks index of CV set at each train/val split
     
-    # Iterate through all train/val splits
-    while 1:
-        start_ix=0; end_ix=0; startCv_ix=0; endCv_ix=0;
-        X_it, y_it, Xcv_it, ycv_it = list(), list(), list(), list()
-        i=0; # Index of individual training set at each train/val split
-        
-        # Iterate until index of individual training set is smaller than index of cv set
-        while (i < j):
-            ## TRAINING DATA
-            start_ix = numJumps*i;
-            end_ix = start_ix + numInputs;
-            
-            seq_x = sequence[start_ix:end_ix] 
-            X_it.append(seq_x)
-            seq_y = sequence[end_ix:end_ix+numOutputs]
-            y_it.append(seq_y)
-            
-            i+=1;
-          
-        # Once val data crosses time series length return   
-        if (((end_ix+numInputs)+numOutputs) > len(sequence)):
-            break
-        
-        ## CROSS-VALIDATION DATA
-        startCv_ix = end_ix;
-        endCv_ix = end_ix + numInputs;
-        
-        seq_xcv = sequence[startCv_ix:endCv_ix] 
-        Xcv_it.append(seq_xcv)
-        seq_ycv = sequence[endCv_ix:endCv_ix+numOutputs]
-        ycv_it.append(seq_ycv) 
-            
-        ## Add another train/val split 
-        X[j-2] = np.array(X_it)
-        y[j-2] = np.array(y_it)
-        Xcv[j-2] = np.array(Xcv_it)
-        ycv[j-2] = np.array(ycv_it)
-        
-        j+=1;
+    # Fold j trains on windows 0..j+1 and validates on the window right after the last one
+    numFolds = len(plan_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps, dilation, targetDilation))
+    numTrain = numFolds+1 if numFolds > 0 else 0
+    indexed = time.perf_counter()
+    
+    inputSpan = numInputs*dilation
+    
+    ## TRAINING DATA, shared by all train/val splits
+    X_all = strided_windows(sequence, 0, numInputs, numTrain, numJumps, dilation)
+    y_all = strided_windows(sequence, inputSpan, numOutputs, numTrain, numJumps, targetDilation)
+    
+    ## CROSS-VALIDATION DATA
+    Xcv_all = strided_windows(sequence, numJumps+inputSpan, numInputs, numFolds, numJumps, dilation)
+    ycv_all = strided_windows(sequence, numJumps+2*inputSpan, numOutputs, numFolds, numJumps, targetDilation)
+    
+    materialize = (lambda view: view) if asViews else (lambda view: np.array(view, dtype=dtype))
+    
+    for j in range(numFolds):
+        ## Add another train/val split
+        X[j] = materialize(X_all[:j+2])
+        y[j] = materialize(y_all[:j+2])
+        Xcv[j] = materialize(Xcv_all[j:j+1])
+        ycv[j] = materialize(ycv_all[j:j+1])
         
     if (len(X)==0 or len(Xcv)==0):
-        print("The sequence provided does not has size enough to populate the return arrays")
+        warn_short("The sequence provided does not has size enough to populate the return arrays",
+                   "split_train_val_forwardChaining", sequence_length(sequence), numInputs, numOutputs, numJumps)
+    
+    report_split("split_train_val_forwardChaining", sequence, (X, y, Xcv, ycv), begin, indexed, numFolds, count_windows(X, Xcv), source)
    
     return X, y, Xcv, ycv
 
 
-def split_train_val_kFold(sequence, numInputs, numOutputs, numJumps):
+def split_train_val_kFold(sequence, numInputs, numOutputs, numJumps, dtype=None, asShared=False, dilation=1, targetDilation=1):
     """ Returns sets to train and cross-validate a model using K-Fold technique
     
     Parameters:
-        sequence (array)  : Full training dataset
+        sequence (array)  : Full training dataset, or path to a .npy file
         numInputs (int)   : Number of inputs X and Xcv used at each training
         numOutputs (int)  : Number of outputs y and ycv used at each training
         numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast while they are gathered
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
+        asShared (bool)   : If True, return a SharedFolds that stores every distinct window once
+                            and gathers the windows of each split on demand
 
     Returns:
         X (2D array)    : Array of numInputs arrays used for training
@@ -87,76 +95,36 @@ def split_train_val_kFold(sequence, numInputs, numOutputs, numJumps):
         
     """
     
-    X, y, Xcv, ycv = dict(), dict(), dict(), dict()
-    j=2; # Tracks index of CV set at each train/val split
-    theEnd = 0; # Flag to terminate function
-    
-    # Iterate until val set falls outside time series length
-    while 1:
-        start_ix=0; end_ix=0; startCv_ix=0; endCv_ix=0;
-        X_it, y_it, Xcv_it, ycv_it = list(), list(), list(), list()
-        i=0; # Index of individual training set at each train/val split
-        n=0; # Number of numJumps
-        
-        # Iterate through all train/val splits
-        while 1:
-            if (i != j): 
-                ## TRAINING DATA
-                start_ix = endCv_ix + numJumps*n;
-                end_ix = start_ix + numInputs;
-                n +=1;
-
-                # Leave train/val split loop once training data crosses time series length
-                if end_ix+numOutputs > len(sequence):
-                    break;
-
-                seq_x = sequence[start_ix:end_ix] 
-                X_it.append(seq_x)
-                seq_y = sequence[end_ix:end_ix+numOutputs]
-                y_it.append(seq_y)
-            else:
-                ## CROSS-VALIDATION DATA
-                startCv_ix = end_ix;
-                endCv_ix = end_ix + numInputs;
-                n = 0;
-                
-                # Once val data crosses time series length exit tran/val split loop and return
-                if endCv_ix+numOutputs > len(sequence):
-                    theEnd = 1;
-                    break;
-
-                seq_xcv = sequence[startCv_ix:endCv_ix] 
-                Xcv_it.append(seq_xcv)
-                seq_ycv = sequence[endCv_ix:endCv_ix+numOutputs]
-                ycv_it.append(seq_ycv)
-            i+=1;
-        
-        # Only add a train/val split if the time series length has not been crossed
-        if (theEnd == 1):
-            break
-        
-        ## Add another train/val split 
-        X[j-2] = np.array(X_it)
-        y[j-2] = np.array(y_it)
-        Xcv[j-2] = np.array(Xcv_it)
-        ycv[j-2] = np.array(ycv_it)
-        
-        j+=1;
-        
-    if (len(X)==0 or len(Xcv)==0):
-        print("The sequence provided does not has size enough to populate the return arrays")
-            
-    return X, y, Xcv, ycv
+    begin = time.perf_counter()
+    sequence = load_sequence(sequence)
+    
+    plan = plan_train_val_kFold(sequence, numInputs, numOutputs, numJumps, dilation, targetDilation)
+    indexed = time.perf_counter()
+    
+    if (len(plan)==0):
+        warn_short("The sequence provided does not has size enough to populate the return arrays",
+                   "split_train_val_kFold", sequence_length(sequence), numInputs, numOutputs, numJumps)
+    
+    result = plan.share(sequence, dtype) if asShared else plan.materialize(sequence, dtype)
+    report_split("split_train_val_kFold", sequence, result, begin, indexed, len(plan), count_windows(plan.trainStarts, plan.cvStarts))
+    
+    return result
 
 
-def split_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps):
+def split_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups=5, dtype=None, asShared=False, dilation=1, targetDilation=1):
     """ Returns sets to train and cross-validate a model using group K-Fold technique
     
     Parameters:
-        sequence (array)  : Full training dataset
+        sequence (array)  : Full training dataset, or path to a .npy file
         numInputs (int)   : Number of inputs X and Xcv used at each training
         numOutputs (int)  : Number of outputs y and ycv used at each training
         numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        numGroups (int)   : Number of groups, i.e. train/val splits (at least 2)
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast while they are gathered
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
+        asShared (bool)   : If True, return a SharedFolds that stores every distinct window once
+                            and gathers the windows of each split on demand
 
     Returns:
         X (2D array)    : Array of numInputs arrays used for training
@@ -166,54 +134,212 @@ def split_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps):
     
     """
     
-    X, y, Xcv, ycv = dict(), dict(), dict(), dict()
+    begin = time.perf_counter()
+    sequence = load_sequence(sequence)
+    
+    plan = plan_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups, dilation, targetDilation)
+    indexed = time.perf_counter()
     
-    # Iterate through 5 train/val splits
-    for j in np.arange(5):
-        start_ix=0; end_ix=0; startCv_ix=0; endCv_ix=0;
-        X_it, y_it, Xcv_it, ycv_it = list(), list(), list(), list()
-        i=0; # Index of individual training set at each train/val split
-        n=0; # Number of numJumps
+    # Every group has a split, so the sequence is too short when none of them holds training and cv windows
+    if not any(len(train) and len(cv) for train, cv in zip(plan.trainStarts, plan.cvStarts)):
+        warn_short("The sequence provided does not has size enough to populate the return arrays",
+                   "split_train_val_groupKFold", sequence_length(sequence), numInputs, numOutputs, numJumps)
+    
+    result = plan.share(sequence, dtype) if asShared else plan.materialize(sequence, dtype)
+    report_split("split_train_val_groupKFold", sequence, result, begin, indexed, len(plan), count_windows(plan.trainStarts, plan.cvStarts))
+    
+    return result
+
+
+def iter_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps, dtype=None, dilation=1, targetDilation=1):
+    """ Yields the train/val splits of split_train_val_forwardChaining one at a time, so only one split is held in memory
+    
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training
+        numOutputs (int)  : Number of outputs y and ycv used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast while they are gathered
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Yields:
+        j (int)       : Index of the train/val split
+        train (tuple) : (X, y) training windows
+        cv (tuple)    : (Xcv, ycv) cross-validation windows
         
-        while 1: 
-            if ((i+1+j)%(5) != 0):
-                # TRAINING DATA
-                start_ix = endCv_ix + numJumps*n;
-                end_ix = start_ix + numInputs;
-                n+=1;
-
-                # Leave train/val split loop once training data crosses time series length
-                if end_ix+numOutputs > len(sequence)-1:
-                    break 
-
-                seq_x = sequence[start_ix:end_ix] 
-                X_it.append(seq_x)
-                seq_y = sequence[end_ix:end_ix+numOutputs]
-                y_it.append(seq_y)
-            else:
-                # CROSS-VALIDATION DATA
-                startCv_ix = end_ix;
-                endCv_ix = end_ix + numInputs;
-                n=0;
-
-                # Once val data crosses time series length return   
-                if ((endCv_ix+numOutputs) > len(sequence)):
-                    break
-
-                seq_xcv = sequence[startCv_ix:endCv_ix] 
-                Xcv_it.append(seq_xcv)
-                seq_ycv = sequence[endCv_ix:endCv_ix+numOutputs]
-                ycv_it.append(seq_ycv)  
-                
-            i+=1;
-            
-        ## Add another train/val split     
-        X[j] = np.array(X_it)
-        y[j] = np.array(y_it)
-        Xcv[j] = np.array(Xcv_it)
-        ycv[j] = np.array(ycv_it)
+    """
+    
+    sequence = load_sequence(sequence)
+    
+    return plan_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps, dilation, targetDilation).iter_folds(sequence, dtype)
+
+
+def iter_train_val_kFold(sequence, numInputs, numOutputs, numJumps, dtype=None, dilation=1, targetDilation=1):
+    """ Yields the train/val splits of split_train_val_kFold one at a time, so only one split is held in memory
+    
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training
+        numOutputs (int)  : Number of outputs y and ycv used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast while they are gathered
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Yields:
+        j (int)       : Index of the train/val split
+        train (tuple) : (X, y) training windows
+        cv (tuple)    : (Xcv, ycv) cross-validation windows
         
-    if (len(X)==0 or len(Xcv)==0):
-        print("The sequence provided does not has size enough to populate the return arrays")
-            
-    return X, y, Xcv, ycv
+    """
+    
+    sequence = load_sequence(sequence)
+    
+    return plan_train_val_kFold(sequence, numInputs, numOutputs, numJumps, dilation, targetDilation).iter_folds(sequence, dtype)
+
+
+def iter_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups=5, dtype=None, dilation=1, targetDilation=1):
+    """ Yields the train/val splits of split_train_val_groupKFold one at a time, so only one split is held in memory
+    
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training
+        numOutputs (int)  : Number of outputs y and ycv used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        numGroups (int)   : Number of groups, i.e. train/val splits (at least 2)
+        dtype (dtype)     : Type of the windows, e.g. np.float32, cast while they are gathered
+        dilation (int)    : Number of sequence samples between consecutive inputs, taken as an extra view stride
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Yields:
+        j (int)       : Index of the train/val split
+        train (tuple) : (X, y) training windows
+        cv (tuple)    : (Xcv, ycv) cross-validation windows
+        
+    """
+    
+    sequence = load_sequence(sequence)
+    
+    return plan_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups, dilation, targetDilation).iter_folds(sequence, dtype)
+
+
+def plan_train_val_forwardChaining(sequence, numInputs, numOutputs, numJumps, dilation=1, targetDilation=1):
+    """ Returns the window starts of the splits made by split_train_val_forwardChaining
+    
+    Parameters:
+        sequence (array)  : Full training dataset (or its length), or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training and validation
+        numOutputs (int)  : Number of outputs y and ycv used at each training and validation
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        dilation (int)    : Number of sequence samples between consecutive inputs
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Returns:
+        plan (SplitPlan): Training and cross-validation window starts of each split
+        
+    """
+    
+    lenSequence = sequence_length(sequence)
+    
+    # Dilated windows span numInputs*dilation and numOutputs*targetDilation samples of the sequence
+    inputSpan, outputSpan = numInputs*dilation, numOutputs*targetDilation
+    
+    numFolds = max(0, (lenSequence-2*inputSpan-outputSpan)//numJumps)
+    
+    # Training sets of every split are prefixes of the same starts, so they share memory
+    starts = numJumps*np.arange(numFolds+1)
+    cvStarts_all = compact_starts(starts[1:] + inputSpan, lenSequence)
+    starts = compact_starts(starts, lenSequence)
+    
+    trainStarts = [starts[:j+2] for j in range(numFolds)]
+    cvStarts = [cvStarts_all[j:j+1] for j in range(numFolds)]
+    
+    return SplitPlan(numInputs, numOutputs, trainStarts, cvStarts,
+                     dilation=dilation, targetDilation=targetDilation)
+
+
+def plan_train_val_kFold(sequence, numInputs, numOutputs, numJumps, dilation=1, targetDilation=1):
+    """ Returns the window starts of the splits made by split_train_val_kFold
+    
+    Parameters:
+        sequence (array)  : Full training dataset (or its length), or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training
+        numOutputs (int)  : Number of outputs y and ycv used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        dilation (int)    : Number of sequence samples between consecutive inputs
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Returns:
+        plan (SplitPlan): Training and cross-validation window starts of each split
+        
+    """
+    
+    lenSequence = sequence_length(sequence)
+    
+    # Dilated windows span numInputs*dilation and numOutputs*targetDilation samples of the sequence
+    inputSpan, outputSpan = numInputs*dilation, numOutputs*targetDilation
+    
+    trainStarts, cvStarts = list(), list()
+    numFolds = max(0, (lenSequence-2*inputSpan-outputSpan)//numJumps)
+    
+    for j in range(numFolds):
+        ## TRAINING DATA before the cv set
+        before = numJumps*np.arange(j+2)
+        
+        ## CROSS-VALIDATION DATA
+        startCv_ix = numJumps*(j+1) + inputSpan
+        
+        ## TRAINING DATA after the cv set, until it crosses time series length
+        start_ix = startCv_ix + inputSpan
+        after = start_ix + numJumps*np.arange(window_count(lenSequence, inputSpan+outputSpan, numJumps, start_ix))
+        
+        trainStarts.append(compact_starts(np.concatenate((before, after)), lenSequence))
+        cvStarts.append(compact_starts([startCv_ix], lenSequence))
+    
+    return SplitPlan(numInputs, numOutputs, trainStarts, cvStarts,
+                     dilation=dilation, targetDilation=targetDilation)
+
+
+def plan_train_val_groupKFold(sequence, numInputs, numOutputs, numJumps, numGroups=5, dilation=1, targetDilation=1):
+    """ Returns the window starts of the splits made by split_train_val_groupKFold
+    
+    Parameters:
+        sequence (array)  : Full training dataset (or its length), or path to a .npy file
+        numInputs (int)   : Number of inputs X and Xcv used at each training
+        numOutputs (int)  : Number of outputs y and ycv used at each training
+        numJumps (int)    : Number of sequence samples to be ignored between (X,y) sets
+        numGroups (int)   : Number of groups, i.e. train/val splits (at least 2)
+        dilation (int)    : Number of sequence samples between consecutive inputs
+        targetDilation (int): Number of sequence samples between consecutive outputs
+
+    Returns:
+        plan (SplitPlan): Training and cross-validation window starts of each split
+    
+    """
+    
+    lenSequence = sequence_length(sequence)
+    
+    # Dilated windows span numInputs*dilation and numOutputs*targetDilation samples of the sequence
+    inputSpan, outputSpan = numInputs*dilation, numOutputs*targetDilation
+    
+    if (numGroups < 2):
+        raise ValueError("Group K-Fold needs at least 2 groups")
+    
+    trainStarts, cvStarts = list(), list()
+    
+    # Every numGroups-th window position is a cv window, the others are training windows
+    for j in range(numGroups):
+        layout = (numGroups, (numGroups-1-j) % numGroups, numJumps, inputSpan, inputSpan)
+        
+        # Leave at the first training window crossing lenSequence-1 or cv window crossing lenSequence
+        end = interleaved_end(*layout, lenSequence-1-inputSpan-outputSpan, lenSequence-inputSpan-outputSpan)
+        starts, isCv = interleaved_starts(end, *layout)
+        starts = compact_starts(starts, lenSequence)
+        
+        ## Add another train/val split
+        trainStarts.append(starts[~isCv])
+        cvStarts.append(starts[isCv])
+    
+    return SplitPlan(numInputs, numOutputs, trainStarts, cvStarts,
+                     dilation=dilation, targetDilation=targetDilation)
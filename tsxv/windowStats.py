@@ -0,0 +1,217 @@
+"""
+Per-window and per-fold normalization statistics computed in O(n) over the sequence, and fused window scaling
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .windows import CHUNK_BYTES, as_sequence, strided_windows, window_count, window_span
+
+WindowStats = namedtuple("WindowStats", ["mean", "std", "min", "max"])
+
+
+def _sliding_extreme(values, width, accumulate, fill):
+    """ Returns the extreme of every window of values, in O(n) whatever the width (van Herk/Gil-Werman)
+
+        values is cut in blocks of width samples: a window spans the end of one block and the start of the next,
+        so its extreme is that of the block suffix it starts in and of the block prefix it ends in
+    """
+
+    numWindows = len(values) - width + 1
+    numBlocks = -(-len(values)//width)
+    padded = np.full((numBlocks*width,) + values.shape[1:], fill)
+    padded[:len(values)] = values
+    blocks = padded.reshape((numBlocks, width) + values.shape[1:])
+
+    prefix = accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+
+    return suffix[:numWindows], prefix[width-1:width-1+numWindows]
+
+
+def _phases(values, dilation, fill):
+    """ Returns values reshaped to (rows, dilation, ...), column r holding values[r], values[r+dilation], ... """
+
+    numRows = -(-len(values)//dilation)
+    padded = np.full((numRows*dilation,) + values.shape[1:], fill, dtype=np.float64)
+    padded[:len(values)] = values
+    return padded.reshape((numRows, dilation) + values.shape[1:])
+
+
+def _window_moments(phased, row, phase, width):
+    """ Returns the mean and variance of the windows of width rows starting at the given rows and phases of phased
+
+        Cumulative sums restart at every block of width rows, each block centered on its first row, so they
+        never grow beyond one window and the variance does not cancel out on long or trending series.
+        A window spans the end of its first block and the start of the next one, whose sums are
+        shifted to the center of the first block before they are added
+    """
+
+    numBlocks = -(-len(phased)//width) + 1
+    padded = np.zeros((numBlocks*width,) + phased.shape[1:])
+    padded[:len(phased)] = phased
+    blocks = padded.reshape((numBlocks, width) + phased.shape[1:])
+
+    centers = blocks[:, 0]
+    local = blocks - centers[:, None]
+    zero = np.zeros((numBlocks, 1) + phased.shape[1:])
+    sums = np.concatenate((zero, np.cumsum(local, axis=1)), axis=1)
+    squares = np.concatenate((zero, np.cumsum(local**2, axis=1)), axis=1)
+
+    block, offset = row//width, row % width
+    shift = centers[block+1, phase] - centers[block, phase]
+    numNext = offset.reshape(offset.shape + (1,)*(phased.ndim-2))
+
+    # Samples offset..width-1 of the first block, then 0..offset-1 of the next block, around the first block's center
+    head = sums[block, width, phase] - sums[block, offset, phase]
+    headSquares = squares[block, width, phase] - squares[block, offset, phase]
+    tail = sums[block+1, offset, phase]
+    tailSquares = squares[block+1, offset, phase]
+
+    total = head + tail + numNext*shift
+    totalSquares = headSquares + tailSquares + 2*shift*tail + numNext*shift**2
+
+    mean = total/width
+    return centers[block, phase] + mean, np.maximum(totalSquares/width - mean**2, 0)
+
+
+def window_stats(sequence, starts, width, dilation=1):
+    """ Returns the mean, standard deviation, min and max of the windows that begin at the given offsets,
+        from block-wise cumulative sums and block extremes over the sequence, without gathering any window
+        i.e. mean[k] = np.mean(sequence[starts[k]:starts[k]+width*dilation:dilation], axis=0)
+
+    Parameters:
+        sequence (array)  : Full training dataset, time along the first axis
+        starts (array)    : Index of the first sample of each window
+        width (int)       : Number of samples of each window
+        dilation (int)    : Number of sequence samples between consecutive samples of a window
+
+    Returns:
+        stats (WindowStats): mean, std, min and max arrays of shape (len(starts), *sequence.shape[1:])
+
+    """
+
+    sequence = as_sequence(sequence)
+    starts = np.asarray(starts, dtype=np.intp)
+    values = sequence.astype(np.float64)
+    if (len(starts) == 0 or window_span(width, dilation) > len(values)):
+        empty = np.empty((0,) + sequence.shape[1:])
+        return WindowStats(empty, empty, empty, empty)
+
+    # The samples of a dilated window are consecutive in one phase of the sequence: the window
+    # starting at s is the window starting at row s//dilation of column s%dilation of _phases
+    row, phase = starts//dilation, starts % dilation
+
+    mean, var = _window_moments(_phases(values, dilation, 0), row, phase, width)
+    std = np.sqrt(var)
+
+    suffix, prefix = _sliding_extreme(_phases(values, dilation, np.inf), width, np.minimum.accumulate, np.inf)
+    minimum = np.minimum(suffix[row, phase], prefix[row, phase])
+    suffix, prefix = _sliding_extreme(_phases(values, dilation, -np.inf), width, np.maximum.accumulate, -np.inf)
+    maximum = np.maximum(suffix[row, phase], prefix[row, phase])
+
+    return WindowStats(mean, std, minimum, maximum)
+
+
+def fold_stats(plan, j, sequence):
+    """ Returns the mean, standard deviation, min and max of the training inputs X of a split,
+        so that no cross-validation or test sample leaks into the normalization
+        i.e. mean = np.mean(X, axis=(0, 1)) for the training X of split j
+
+    Parameters:
+        plan (SplitPlan)  : Plan returned by one of the plan_* functions
+        j (int)           : Index of the split
+        sequence (array)  : Full training dataset the plan was computed for
+
+    Returns:
+        stats (WindowStats): mean, std, min and max arrays of shape sequence.shape[1:]
+
+    """
+
+    stats = window_stats(sequence, plan.trainStarts[j], plan.numInputs, plan.dilation)
+    if (len(stats.mean) == 0):
+        raise ValueError("Split %d has no training windows" % j)
+
+    # Windows have equal widths, so the fold moments are the means of the window moments
+    mean = stats.mean.mean(axis=0)
+    var = (stats.std**2).mean(axis=0) + ((stats.mean - mean)**2).mean(axis=0)
+
+    return WindowStats(mean, np.sqrt(np.maximum(var, 0)), stats.min.min(axis=0), stats.max.max(axis=0))
+
+
+def scale_windows(sequence, starts, width, mean, std, dtype=None, dilation=1):
+    """ Returns the windows that begin at the given offsets, gathered and scaled in a single pass
+        i.e. W[k] = (sequence[starts[k]:starts[k]+width*dilation:dilation] - mean) / std
+
+    Parameters:
+        sequence (array)  : Full training dataset, time along the first axis
+        starts (array)    : Index of the first sample of each window
+        width (int)       : Number of samples covered by each window
+        mean (array)      : Mean shaped sequence.shape[1:] shared by every window,
+                            or shaped (len(starts), *sequence.shape[1:]) with one mean per window
+        std (array)       : Standard deviation shaped as mean, zeros are replaced by ones
+        dtype (dtype)     : Type of the scaled windows, defaults to the floating type of the sequence
+        dilation (int)    : Number of sequence samples between consecutive samples of a window
+
+    Returns:
+        W (array): Scaled windows of shape (len(starts), width, *sequence.shape[1:])
+
+    """
+
+    sequence = as_sequence(sequence)
+    starts = np.asarray(starts, dtype=np.intp)
+    if dtype is None:
+        dtype = np.result_type(sequence.dtype, np.float32)
+
+    mean = np.asarray(mean, dtype=np.float64)
+    std = np.asarray(std, dtype=np.float64)
+    std = np.where(std > 0, std, 1)
+    perWindow = mean.ndim == sequence.ndim
+    if perWindow:
+        mean, std = mean[:, None], std[:, None]
+
+    out = np.empty((len(starts), width) + sequence.shape[1:], dtype=dtype)
+    if (len(starts) == 0):
+        return out
+
+    allWindows = strided_windows(sequence, 0, width, window_count(len(sequence), window_span(width, dilation), 1), 1, dilation)
+    chunk = max(1, CHUNK_BYTES//(allWindows[0].size*max(sequence.itemsize, out.itemsize)))
+    for i in range(0, len(starts), chunk):
+        part = out[i:i+chunk]
+        np.subtract(allWindows[starts[i:i+chunk]], mean[i:i+chunk] if perWindow else mean, out=part, casting="unsafe")
+        np.divide(part, std[i:i+chunk] if perWindow else std, out=part, casting="unsafe")
+
+    return out
+
+
+def normalize_fold(plan, j, sequence, perWindow=False, dtype=None):
+    """ Returns the windows of a split already scaled to zero mean and unit standard deviation
+
+    Parameters:
+        plan (SplitPlan)  : Plan returned by one of the plan_* functions
+        j (int)           : Index of the split
+        sequence (array)  : Full training dataset the plan was computed for
+        perWindow (bool)  : If True, each X and its y are scaled by the statistics of that X,
+                            otherwise every window is scaled by fold_stats of the split
+        dtype (dtype)     : Type of the scaled windows, defaults to the floating type of the sequence
+
+    Returns:
+        windows (tuple)  : Scaled X, y, Xcv, ycv (and Xtest, ytest) of the split
+        stats            : WindowStats of the split, or, if perWindow, a tuple of the WindowStats
+                           of the train, cv (and test) inputs, to undo the scaling
+
+    """
+
+    sets = [plan.trainStarts[j], plan.cvStarts[j]] + ([] if plan.testStarts is None else [plan.testStarts[j]])
+    stats = ([window_stats(sequence, starts, plan.numInputs, plan.dilation) for starts in sets] if perWindow
+             else fold_stats(plan, j, sequence))
+
+    windows = list()
+    for k, starts in enumerate(sets):
+        mean, std = (stats[k].mean, stats[k].std) if perWindow else (stats.mean, stats.std)
+        windows.append(scale_windows(sequence, starts, plan.numInputs, mean, std, dtype, plan.dilation))
+        windows.append(scale_windows(sequence, np.asarray(starts, dtype=np.intp)+plan.numInputs*plan.dilation,
+                                     plan.numOutputs, mean, std, dtype, plan.targetDilation))
+
+    return tuple(windows), tuple(stats) if perWindow else stats
@@ -0,0 +1,230 @@
+"""
+Strided window engine shared by the splitters: builds (X, y) windows as read-only views over the original sequence
+"""
+
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Upper bound on the bytes copied at once when windows are written to an output array
+CHUNK_BYTES = 64*2**20
+
+
+def load_sequence(sequence):
+    """ Returns the sequence, memory-mapping it read-only when a path to a .npy file is given
+
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+
+    Returns:
+        sequence (array): The given sequence, or a read-only np.memmap of the file
+
+    """
+
+    if isinstance(sequence, (str, os.PathLike)):
+        return np.load(sequence, mmap_mode='r')
+
+    return sequence
+
+
+def sequence_length(sequence):
+    """ Returns the number of samples of the sequence, which may also be given directly as an int
+
+    Parameters:
+        sequence (array)  : Full training dataset (or its length), or path to a .npy file
+
+    Returns:
+        lenSequence (int): Number of samples along the time axis
+
+    """
+
+    if isinstance(sequence, (int, np.integer)):
+        return int(sequence)
+
+    return len(load_sequence(sequence))
+
+
+def as_sequence(sequence):
+    """ Returns the sequence as a numpy array without copying its buffer
+
+    Parameters:
+        sequence (array)  : Full training dataset, or path to a .npy file
+
+    Returns:
+        sequence (array): Array sharing memory with the input (or the mapped file) whenever possible
+
+    """
+
+    return np.asarray(load_sequence(sequence))
+
+
+def result_arrays(value):
+    """ Yields every numpy array held by a splitter result: arrays, dicts, lists, tuples and objects of them
+
+    Parameters:
+        value  : Output of a splitter, e.g. the (X, y, Xcv, ycv) dictionaries, a SplitPlan or a SharedFolds
+
+    Yields:
+        array (array): Each array of the result, in traversal order
+
+    """
+
+    if isinstance(value, np.ndarray):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from result_arrays(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from result_arrays(item)
+    elif hasattr(value, "__dict__"):
+        yield from result_arrays(vars(value))
+
+
+def index_dtype(maxValue):
+    """ Returns the smallest signed integer type holding every index from -maxValue to maxValue
+
+    Parameters:
+        maxValue (int)  : Largest index to hold, e.g. the sequence length
+
+    Returns:
+        dtype (np.dtype): np.int8, np.int16, np.int32 or np.int64
+
+    """
+
+    for dtype in (np.int8, np.int16, np.int32):
+        if (maxValue <= np.iinfo(dtype).max):
+            return np.dtype(dtype)
+
+    return np.dtype(np.int64)
+
+
+def window_span(width, dilation=1):
+    """ Returns the number of sequence samples from the first to the last sample of a dilated window
+
+    Parameters:
+        width (int)     : Number of samples of the window
+        dilation (int)  : Number of samples between consecutive samples of the window
+
+    Returns:
+        span (int): (width-1)*dilation + 1, or 0 for an empty window
+
+    """
+
+    return (width-1)*dilation + 1 if width > 0 else 0
+
+
+def window_count(lenSequence, width, numJumps, start=0):
+    """ Returns the number of windows of a given width that fit in the sequence
+        when the first window begins at start and consecutive windows are numJumps apart
+
+    Parameters:
+        lenSequence (int)  : Number of samples in the sequence
+        width (int)        : Number of samples covered by each window
+        numJumps (int)     : Number of samples between the start of consecutive windows
+        start (int)        : Index of the first sample of the first window
+
+    Returns:
+        numWindows (int): Number of windows, 0 if not even one window fits
+
+    """
+
+    room = lenSequence - start - width
+    if (room < 0):
+        return 0
+
+    return room//numJumps + 1
+
+
+def strided_windows(sequence, start, width, numWindows, numJumps, dilation=1):
+    """ Returns windows over the sequence as a read-only strided view (no data is copied)
+        i.e. W[k] = sequence[start+k*numJumps], sequence[start+k*numJumps+dilation], ...,
+                    sequence[start+k*numJumps+(width-1)*dilation]
+
+    Parameters:
+        sequence (array)  : Full training dataset, time along the first axis
+        start (int)       : Index of the first sample of the first window
+        width (int)       : Number of samples covered by each window
+        numWindows (int)  : Number of windows
+        numJumps (int)    : Number of samples between the start of consecutive windows
+        dilation (int)    : Number of samples between consecutive samples of a window
+
+    Returns:
+        W (array): View of shape (numWindows, width, *sequence.shape[1:])
+
+    """
+
+    sequence = as_sequence(sequence)
+    if (numWindows > 0 and start+(numWindows-1)*numJumps+window_span(width, dilation) > len(sequence)):
+        raise ValueError("The requested windows do not fit in the sequence")
+
+    stride = sequence.strides[0]
+    return as_strided(sequence[start:],
+                      shape=(numWindows, width) + sequence.shape[1:],
+                      strides=(numJumps*stride, dilation*stride) + sequence.strides[1:],
+                      writeable=False)
+
+
+def panel_windows(panel, start, width, numWindows, numJumps):
+    """ Returns the windows of every series of a panel as a read-only strided view (no data is copied)
+        i.e. W[s, k] = panel[s, start+k*numJumps], ..., panel[s, start+k*numJumps+width-1]
+
+    Parameters:
+        panel (array)     : Series stacked along the first axis, time along the second axis
+        start (int)       : Index of the first sample of the first window
+        width (int)       : Number of samples covered by each window
+        numWindows (int)  : Number of windows per series
+        numJumps (int)    : Number of samples between the start of consecutive windows
+
+    Returns:
+        W (array): View of shape (len(panel), numWindows, width, *panel.shape[2:])
+
+    """
+
+    panel = as_sequence(panel)
+    if (numWindows > 0 and start+(numWindows-1)*numJumps+width > panel.shape[1]):
+        raise ValueError("The requested windows do not fit in the series")
+
+    stride = panel.strides[1]
+    return as_strided(panel[:, start:],
+                      shape=(panel.shape[0], numWindows, width) + panel.shape[2:],
+                      strides=(panel.strides[0], numJumps*stride, stride) + panel.strides[2:],
+                      writeable=False)
+
+
+def gather_windows(sequence, starts, width, out=None, dtype=None, dilation=1):
+    """ Returns a new array holding the windows that begin at the given offsets
+        i.e. W[k] = sequence[starts[k]], sequence[starts[k]+dilation], ..., sequence[starts[k]+(width-1)*dilation]
+
+    Parameters:
+        sequence (array)  : Full training dataset, time along the first axis
+        starts (array)    : Index of the first sample of each window
+        width (int)       : Number of samples covered by each window
+        out (array)       : Optional array (e.g. np.memmap) to write the windows to, filled
+                            in chunks of at most CHUNK_BYTES so the copy never sits in RAM at once
+        dtype (dtype)     : Type of the returned windows, e.g. np.float32, cast chunk by chunk
+                            while gathering. None keeps the sequence dtype (or the dtype of out)
+        dilation (int)    : Number of samples between consecutive samples of a window
+
+    Returns:
+        W (array): Array of shape (len(starts), width, *sequence.shape[1:])
+
+    """
+
+    sequence = as_sequence(sequence)
+    if (out is None and dtype is not None and np.dtype(dtype) != sequence.dtype):
+        out = np.empty((len(starts), width) + sequence.shape[1:], dtype=dtype)
+
+    if (len(starts) == 0):
+        return np.empty((0, width) + sequence.shape[1:], dtype=sequence.dtype) if out is None else out
+
+    allWindows = strided_windows(sequence, 0, width, window_count(len(sequence), window_span(width, dilation), 1), 1, dilation)
+    if out is None:
+        return allWindows[starts]
+
+    chunk = max(1, CHUNK_BYTES//(allWindows[0].size*sequence.itemsize))
+    for i in range(0, len(starts), chunk):
+        out[i:i+chunk] = allWindows[starts[i:i+chunk]]
+
+    return out